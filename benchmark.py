@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import schedule1_rename_tool
+from schedule1_rename_tool import (Schedule1ModTool, ProductCatalog, ProductRecord, JsonSerializer,
+                                   find_save_folders, intern_properties, orjson)
+from synthetic_save import generate_save, make_save_data
+
+# Product counts of the regression suite
+SUITE_TIERS = [100, 10000, 100000]
+# Steam ID folder the suite's saves are generated under
+BENCH_STEAM_ID = "76561198000000000"
+
+def time_call(func, repeat=3):
+    """Return the best wall-clock time of several calls, in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def bench_parallel_load(counts, workers):
+    """Time a cold get_product_details() at each product count and worker count."""
+    print("=== Parallel product loading ===")
+    print(f"{'products':>10} " + " ".join(f"{f'{w} worker(s)':>14}" for w in workers))
+
+    for count in counts:
+        save_path = tempfile.mkdtemp(prefix="s1bench_")
+        try:
+            generate_save(save_path, count)
+            tool = Schedule1ModTool(save_path)
+            tool.load_products_data()
+
+            timings = []
+            for worker_count in workers:
+                def cold_load():
+                    # Clear the detail cache so every file is read again
+                    tool._product_cache.clear()
+                    tool.get_product_details(max_workers=worker_count)
+                timings.append(time_call(cold_load))
+
+            print(f"{count:>10} " + " ".join(f"{t * 1000:>11.1f} ms" for t in timings))
+        finally:
+            shutil.rmtree(save_path, ignore_errors=True)
+
+def traced_size(build):
+    """Bytes still allocated by the object build() returns, while it is alive."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+def bench_catalog_memory(count):
+    """Compare the memory held by the old dict lists and by a ProductCatalog."""
+    print(f"=== Product detail memory ({count} products) ===")
+    # Parse real JSON text so every product gets its own string objects, as when read from disk
+    texts = [json.dumps(product_data) for product_data in make_save_data(count)[1].values()]
+
+    def build_dicts():
+        # Detail dicts plus the formatted copy the Treeview used to keep
+        details = []
+        rows = []
+        for text in texts:
+            data = json.loads(text)
+            product = {"id": data["ID"], "name": data["Name"], "type": data["DataType"],
+                       "properties": data["Properties"]}
+            details.append(product)
+            rows.append((product["id"], product["name"], product["type"].replace("ProductData", ""),
+                         ", ".join(product["properties"])))
+        return details, rows
+
+    def build_catalog():
+        records = []
+        for text in texts:
+            data = json.loads(text)
+            records.append(ProductRecord(data["ID"], data["Name"], sys.intern(data["DataType"]),
+                                         intern_properties(data["Properties"])))
+        return ProductCatalog(records)
+
+    dict_size = traced_size(build_dicts)
+    catalog_size = traced_size(build_catalog)
+    print(f"{'dict lists':>16} {dict_size / 1024 / 1024:>8.1f} MiB")
+    print(f"{'ProductCatalog':>16} {catalog_size / 1024 / 1024:>8.1f} MiB  "
+          f"({catalog_size / dict_size:.0%} of dict lists)")
+
+def bench_serializer(count):
+    """Compare Products.json write throughput and size for each backend and style."""
+    print(f"=== Products.json serialization ({count} products) ===")
+    data = make_save_data(count)[0]
+
+    cases = [("json.dumps(indent=4)", lambda: json.dumps(data, indent=4))]
+    backends = [False, True] if orjson is not None else [False]
+    for use_orjson in backends:
+        for style in JsonSerializer.STYLES:
+            serializer = JsonSerializer(style, use_orjson=use_orjson)
+            cases.append((f"{serializer.backend} {style}", lambda s=serializer: s.dumps(data, 4)))
+    if orjson is None:
+        print("(orjson is not installed, only the stdlib backend is measured)")
+
+    print(f"{'serializer':>22} {'time':>10} {'size':>10} {'throughput':>12}")
+    for label, dumps in cases:
+        size = len(dumps())
+        elapsed = time_call(dumps)
+        print(f"{label:>22} {elapsed * 1000:>7.1f} ms {size / 1024 / 1024:>6.1f} MiB "
+              f"{size / 1024 / 1024 / elapsed:>7.1f} MiB/s")
+
+def bench_patch_rename(counts):
+    """Compare building Products.json for one rename by patching vs full serialization."""
+    print("=== Products.json rewrite for one rename ===")
+    print(f"{'products':>10} {'patch':>10} {'serialize':>12}")
+
+    for count in counts:
+        save_path = tempfile.mkdtemp(prefix="s1bench_")
+        try:
+            products_data = make_save_data(count)[0]
+            with open(os.path.join(save_path, "Products.json"), 'w') as f:
+                json.dump(products_data, f, indent=4)
+            tool = Schedule1ModTool(save_path)
+            tool.load_products_data()
+
+            # Rename back and forth so every call does the same work
+            names = [products_data["DiscoveredProducts"][0], "benchrenamed"]
+            def rename():
+                tool._rewrite_references({names[0]: names[1]})
+                names.reverse()
+                return tool._serialize_products_json()
+
+            patched = time_call(rename)
+            tool._products_patcher = None
+            serialized = time_call(rename)
+
+            print(f"{count:>10} {patched * 1000:>7.1f} ms {serialized * 1000:>9.1f} ms")
+        finally:
+            shutil.rmtree(save_path, ignore_errors=True)
+
+def time_runs(func, repeat, teardown=None):
+    """Wall-clock times of repeated calls, in seconds; teardown runs untimed after each."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+        if teardown:
+            teardown()
+    return runs
+
+def run_suite(tiers, repeat):
+    """Time the main tool operations on a generated save of each size.
+    
+    Returns a list of result dicts with the tier, operation, best and mean
+    time and every run, in seconds.
+    """
+    results = []
+    print(f"{'products':>10} {'operation':<28} {'best':>12} {'mean':>12}")
+
+    for count in tiers:
+        root = tempfile.mkdtemp(prefix="s1bench_")
+        try:
+            # One save of the tier size next to a few small ones, as found in a Saves folder
+            steam_folder = os.path.join(root, BENCH_STEAM_ID)
+            save_path = os.path.join(steam_folder, "SaveGame_1")
+            generate_save(save_path, count)
+            for number in range(2, 5):
+                generate_save(os.path.join(steam_folder, f"SaveGame_{number}"), 10, seed=number)
+
+            def record(operation, func, teardown=None):
+                runs = time_runs(func, repeat, teardown)
+                results.append({"tier": count, "operation": operation, "best": min(runs),
+                                "mean": sum(runs) / len(runs), "runs": runs})
+                print(f"{count:>10} {operation:<28} {min(runs) * 1000:>9.1f} ms "
+                      f"{sum(runs) / len(runs) * 1000:>9.1f} ms")
+
+            record("load_products_data", lambda: Schedule1ModTool(save_path).load_products_data())
+
+            tool = Schedule1ModTool(save_path)
+            tool.load_products_data()
+            def cold_details():
+                tool._product_cache.clear()
+                tool.get_product_details()
+            record("get_product_details (cold)", cold_details)
+            record("get_product_details (warm)", tool.get_product_details)
+
+            # Renames go back and forth so every run does the same work; backups are timed separately
+            tool.backup_made = True
+            product_ids = list(tool.get_product_list())
+            single = [(product_ids[0], "benchrenamed", None)]
+            def rename_single():
+                tool.change_product_ids(single)
+                single[0] = (single[0][1], single[0][0], None)
+            record("rename (single)", rename_single)
+
+            bulk = [(product_id, f"{product_id}bench", None) for product_id in product_ids[:max(1, count // 10)]]
+            def rename_bulk():
+                tool.bulk_rename_from_list(bulk)
+                bulk[:] = [(new_id, old_id, None) for old_id, new_id, _ in bulk]
+            record(f"rename (bulk {len(bulk)})", rename_bulk)
+            record("check_integrity (warm)", tool.check_integrity)
+
+            def backup():
+                tool.backup_made = False
+                tool.make_backup()
+            def remove_backup():
+                shutil.rmtree(tool.last_backup_path, ignore_errors=True)
+            tool.backup_mode = "copy"
+            record("make_backup (copy)", backup, remove_backup)
+            # Each snapshot after the first hard-links the unchanged files
+            tool.backup_mode = "snapshot"
+            tool.backup_keep = repeat + 1
+            record("make_backup (snapshot)", backup)
+
+            def scan_cold():
+                schedule1_rename_tool._save_scanner._listings.clear()
+                find_save_folders([root])
+            record("find_save_folders (cold)", scan_cold)
+            record("find_save_folders (warm)", lambda: find_save_folders([root]))
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return results
+
+def suite_report(results, tiers, repeat):
+    """The machine-readable suite output."""
+    return {
+        "tool_version": schedule1_rename_tool.__version__,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_backend": JsonSerializer().backend,
+        "tiers": tiers,
+        "repeat": repeat,
+        "results": results,
+    }
+
+def compare_reports(baseline, current, threshold=0.2):
+    """Print the change in best time per operation against a baseline report.
+    
+    Returns the number of operations more than threshold slower.
+    """
+    print(f"=== Compared with {baseline.get('tool_version')} ({baseline.get('timestamp')}) ===")
+    previous = {(result["tier"], result["operation"]): result["best"] for result in baseline["results"]}
+    regressions = 0
+    for result in current["results"]:
+        before = previous.get((result["tier"], result["operation"]))
+        if not before:
+            continue
+        change = result["best"] / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{result['tier']:>10} {result['operation']:<28} {change:>+8.0%}{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    benchmarks = {
+        "suite": "time the main operations across size tiers",
+        "parallel": "compare worker counts for loading product files",
+        "memory": "compare product detail memory",
+        "serializer": "compare JSON backends and styles",
+        "patch": "compare patching and re-serializing Products.json",
+    }
+    parser = argparse.ArgumentParser(
+        description="Schedule 1 Strain Renamer benchmarks",
+        epilog="benchmarks: " + "; ".join(f"{name}: {text}" for name, text in benchmarks.items()))
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help="benchmarks to run (default: suite)")
+    parser.add_argument("--tiers", type=int, nargs="+", default=SUITE_TIERS,
+                        help="product counts for the suite")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per suite operation")
+    parser.add_argument("--output", help="write the suite results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare the suite results with an earlier --output file")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="product counts for the parallel and patch benchmarks")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16],
+                        help="worker counts to compare")
+    parser.add_argument("--memory-count", type=int, default=100000,
+                        help="product count for the memory comparison")
+    parser.add_argument("--json-count", type=int, default=100000,
+                        help="product count for the serialization comparison")
+    args = parser.parse_args()
+
+    selected = args.benchmarks or ["suite"]
+    unknown = [name for name in selected if name not in benchmarks]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    exit_code = 0
+    if "suite" in selected:
+        report = suite_report(run_suite(args.tiers, args.repeat), args.tiers, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+        if args.compare:
+            with open(args.compare, 'r') as f:
+                exit_code = 1 if compare_reports(json.load(f), report) else 0
+    if "parallel" in selected:
+        bench_parallel_load(args.counts, args.workers)
+    if "memory" in selected:
+        bench_catalog_memory(args.memory_count)
+    if "serializer" in selected:
+        bench_serializer(args.json_count)
+    if "patch" in selected:
+        bench_patch_rename(args.counts)
+    sys.exit(exit_code)
@@ -4,40 +4,1446 @@ import os
 import sys
 import shutil
 import re
-import glob
 import platform
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
-from pathlib import Path
+import queue
+import threading
+import time
+import argparse
+import csv
+import io
+import atexit
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime
 
+# orjson is optional; when installed it serializes save files much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+__version__ = "1.0.0"
+
+# tkinter is imported by _import_tkinter() when the GUI starts, so the
+# command line runs without a display and without paying for Tk
+tk = ttk = filedialog = messagebox = scrolledtext = None
+
+def _import_tkinter():
+    """Import tkinter into the module namespace for the GUI."""
+    global tk, ttk, filedialog, messagebox, scrolledtext
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, scrolledtext
+
+def name_to_id(name):
+    """Create a valid ID from a name (lowercase, remove spaces, special chars)."""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+class ProductIdAllocator:
+    """Hands out unique product IDs in O(1) amortized time.
+    
+    An ID is taken if it belongs to an existing product (listed in
+    DiscoveredProducts or with a file in CreatedProducts) or is reserved for
+    a planned rename. For each base ID the allocator remembers the lowest
+    number that may still be free, so many names mapping to the same base
+    don't probe from 1 every time. The IDs handed out are the same as
+    trying base, base1, base2... and taking the first free one.
+    """
+    
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.reserved = set()
+        # base ID -> lowest number whose "<base><number>" may be free
+        self._next_number = {}
+    
+    def is_taken(self, product_id):
+        """Check whether an ID is used or reserved."""
+        return product_id in self.existing or product_id in self.reserved
+    
+    def allocate(self, base_id, current_id=None):
+        """Reserve base_id, or base_id with the lowest free number appended.
+        
+        current_id is the product being renamed, which may keep its own ID.
+        """
+        if base_id == current_id:
+            return base_id
+        
+        new_id = base_id
+        if self.is_taken(base_id):
+            number = self._next_number.get(base_id, 1)
+            while self.is_taken(f"{base_id}{number}"):
+                number += 1
+            self._next_number[base_id] = number + 1
+            new_id = f"{base_id}{number}"
+        
+        self.reserved.add(new_id)
+        return new_id
+    
+    def release(self, product_id):
+        """Drop the reservation of an ID whose rename was not applied."""
+        if product_id in self.reserved:
+            self.reserved.discard(product_id)
+            self._freed(product_id)
+    
+    def commit(self, old_id, new_id):
+        """Record an applied rename: new_id now exists and old_id is free."""
+        self.reserved.discard(new_id)
+        self.existing.add(new_id)
+        if old_id != new_id:
+            self.existing.discard(old_id)
+            self._freed(old_id)
+    
+    def _freed(self, product_id):
+        """Let every base the ID could have been numbered from find it again."""
+        start = len(product_id)
+        while start > 0 and product_id[start - 1].isdigit():
+            start -= 1
+        for split in range(start, len(product_id)):
+            # Numbers are never written with leading zeros
+            if product_id[split] == "0":
+                continue
+            base_id, number = product_id[:split], int(product_id[split:])
+            if self._next_number.get(base_id, 0) > number:
+                self._next_number[base_id] = number
+
+# Rows validated per chunk when streaming a rename file
+RENAME_CHUNK_SIZE = 5000
+
+class RenameImportReport:
+    """Problems found while reading and applying a rename list, collected in one place.
+    
+    Each error is a (line_number, old_id, message) tuple; only the first
+    MAX_ERRORS are kept, but all of them are counted.
+    """
+    
+    MAX_ERRORS = 1000
+    
+    def __init__(self):
+        self.rows = 0
+        self.errors = []
+        self.error_count = 0
+    
+    def add_error(self, line, old_id, message):
+        """Record one problem."""
+        self.error_count += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((line, old_id, message))
+    
+    def add_results(self, lines, results):
+        """Record the failed entries of a rename, given the line each entry came from."""
+        for line, result in zip(lines, results):
+            if not result["success"]:
+                self.add_error(line, result["old_id"], result["error"])
+    
+    def summary(self, limit=15):
+        """A short human-readable list of the first problems."""
+        errors = sorted(self.errors, key=lambda error: error[0])
+        lines = [f"Line {line}: '{old_id}' - {message}" for line, old_id, message in errors[:limit]]
+        if self.error_count > limit:
+            lines.append(f"... and {self.error_count - limit} more")
+        return "\n".join(lines)
+
+def iter_rename_rows(lines, report, delimiter=",", chunk_size=RENAME_CHUNK_SIZE):
+    """Parse original_id,new_name rows with proper CSV quoting.
+    
+    lines is any iterable of text lines (an open file streams it). Yields
+    lists of up to chunk_size (line_number, old_id, new_name) tuples;
+    comment lines starting with # and blank lines are skipped, malformed
+    rows are recorded in report.
+    """
+    reader = csv.reader(lines, delimiter=delimiter)
+    chunk = []
+    for row in reader:
+        if not row or not "".join(row).strip() or row[0].lstrip().startswith("#"):
+            continue
+        
+        report.rows += 1
+        parts = [part.strip() for part in row]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            report.add_error(reader.line_num, parts[0], "expected original_id,new_name")
+            continue
+        
+        chunk.append((reader.line_num, parts[0], parts[1]))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    
+    if chunk:
+        yield chunk
+
+def read_rename_file(path, report, chunk_size=RENAME_CHUNK_SIZE):
+    """Stream a CSV or TSV rename file in chunks, see iter_rename_rows()."""
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        # Tab-separated if the extension says so or the first lines have tabs but no commas
+        sample = f.read(4096)
+        f.seek(0)
+        if path.lower().endswith((".tsv", ".tab")) or ("\t" in sample and "," not in sample):
+            delimiter = "\t"
+        else:
+            delimiter = ","
+        
+        yield from iter_rename_rows(f, report, delimiter, chunk_size)
+
+# Indentation of save files written by the game
+DEFAULT_JSON_INDENT = 4
+
+def detect_json_indent(text):
+    """Get the indentation of a JSON document: a number of spaces, "\t", or None if it has none."""
+    match = re.search(r"\n([ \t]+)\S", text[:4096])
+    if match is None:
+        return None
+    indent = match.group(1)
+    return "\t" if indent.startswith("\t") else len(indent)
+
+# Digits mapped to "0", so number tokens can be found with plain byte searches
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_JSON_NULL_RE = re.compile(rb'null(?=[,\]}\s]|$)')
+
+def _has_json_float(raw):
+    """Check whether JSON bytes may hold a float, or a null (orjson's NaN and Infinity).
+    
+    Text inside strings can give a false positive, never a false negative.
+    """
+    digits = raw.translate(_DIGITS_TO_ZERO)
+    for marker in (b"0.", b"0e"):
+        found = digits.find(marker)
+        while found >= 0:
+            start = found
+            while start > 0 and digits[start - 1] in b"0-":
+                start -= 1
+            # A number token starts the text or follows a delimiter
+            if start == 0 or digits[start - 1] in b"[,: \n\t":
+                return True
+            found = digits.find(marker, found + 1)
+    return _JSON_NULL_RE.search(raw) is not None
+
+def _has_wide_int(raw):
+    """Check whether JSON bytes may hold an integer orjson can't read exactly (19 digits or more)."""
+    return b"0" * 19 in raw.translate(_DIGITS_TO_ZERO)
+
+class JsonSerializer:
+    """Reads and writes save JSON, using orjson when it is installed.
+    
+    With style "preserve" each file is written back with the indentation it
+    was read with; "compact" writes no whitespace at all. Both backends
+    produce the same text, with non-ASCII characters escaped as the stdlib
+    encoder does. orjson formats some floats differently (1e16 for 1e+16,
+    null for NaN), so documents with float values go through the stdlib
+    encoder. Reading falls back the same way for NaN, Infinity and integers
+    wider than 64 bits, which orjson refuses or turns into floats.
+    """
+    
+    STYLES = ("preserve", "compact")
+    
+    def __init__(self, style="preserve", use_orjson=True):
+        if style not in self.STYLES:
+            raise ValueError(f"unknown JSON style '{style}'")
+        self.style = style
+        self.use_orjson = use_orjson and orjson is not None
+    
+    @property
+    def backend(self):
+        """Name of the encoder in use."""
+        return "orjson" if self.use_orjson else "json"
+    
+    def loads(self, text):
+        """Parse JSON text."""
+        if self.use_orjson and isinstance(text, bytes) and not _has_wide_int(text):
+            try:
+                return orjson.loads(text)
+            except orjson.JSONDecodeError:
+                # NaN and Infinity, or text the stdlib decoder reports on as well
+                pass
+        return json.loads(text)
+    
+    def dumps(self, data, indent=DEFAULT_JSON_INDENT):
+        """Serialize data; indent is the original file's indentation (see detect_json_indent())."""
+        if self.style == "compact" or indent is None:
+            indent = None
+        
+        if self.use_orjson:
+            try:
+                text = self._orjson_dumps(data, indent)
+            except TypeError:
+                # Values orjson refuses (e.g. huge ints) go through the stdlib encoder
+                text = None
+            if text is not None:
+                return text
+        
+        if indent is None:
+            return json.dumps(data, separators=(",", ":"))
+        return json.dumps(data, indent=indent)
+    
+    def _orjson_dumps(self, data, indent):
+        """Serialize with orjson, matching the stdlib output; None if the data holds floats."""
+        raw = orjson.dumps(data, option=0 if indent is None else orjson.OPT_INDENT_2)
+        if _has_json_float(raw):
+            return None
+        text = raw.decode("utf-8")
+        if indent is not None and indent != 2:
+            # orjson only indents by two spaces. Swap one level at a time,
+            # outermost first: after level k-1, a deeper line starts with
+            # k-1 new units followed by the old two-space units. Strings
+            # never contain raw newlines, so only indentation matches.
+            unit = indent if isinstance(indent, str) else " " * indent
+            level = 1
+            while True:
+                old_prefix = "\n" + unit * (level - 1) + "  "
+                if old_prefix not in text:
+                    break
+                text = text.replace(old_prefix, "\n" + unit * level)
+                level += 1
+        
+        if not text.isascii():
+            text = re.sub(r"[^\x00-\x7f]", _escape_non_ascii, text)
+        return text
+
+def _escape_non_ascii(match):
+    """\\uXXXX escape(s) for one character, as json.dumps(ensure_ascii=True) writes it."""
+    code = ord(match.group(0))
+    if code < 0x10000:
+        return f"\\u{code:04x}"
+    code -= 0x10000
+    return f"\\u{0xd800 | (code >> 10):04x}\\u{0xdc00 | (code & 0x3ff):04x}"
+
+class OperationCancelled(Exception):
+    """Raised from a progress callback to stop a long-running operation."""
+
+# Set to a file path to record a trace of every operation (the GUI reads it at start)
+TRACE_ENV = "SCHEDULE1_TRACE"
+
+class TraceSpan:
+    """One timed operation, with the number of files and bytes it handled."""
+    
+    __slots__ = ("name", "start", "duration", "files", "bytes", "depth", "thread", "args", "seq")
+    
+    def __init__(self, name, depth, args):
+        self.name = name
+        self.depth = depth
+        self.args = args
+        self.thread = threading.get_ident()
+        self.files = 0
+        self.bytes = 0
+        self.duration = None
+        self.seq = None
+        self.start = time.perf_counter()
+    
+    def add(self, files=0, bytes=0):
+        """Count files and bytes handled by the operation."""
+        self.files += files
+        self.bytes += bytes
+
+class Tracer:
+    """Records timed spans around the tool's operations.
+    
+    Recent spans are kept in memory for the GUI's timing readout. After
+    enable(), every finished span is also appended to a trace file, as JSON
+    lines or in the Chrome trace format (open it in chrome://tracing or
+    Perfetto).
+    """
+    
+    FORMATS = ("jsonl", "chrome")
+    
+    def __init__(self, keep=10000):
+        self.spans = deque(maxlen=keep)
+        self.path = None
+        self.format = None
+        self._file = None
+        self._seq = 0
+        self._epoch = time.time() - time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def enable(self, path, trace_format=None):
+        """Start writing spans to a file; the format defaults to chrome for .json files."""
+        if trace_format is None:
+            trace_format = "chrome" if path.lower().endswith(".json") else "jsonl"
+        if trace_format not in self.FORMATS:
+            raise ValueError(f"unknown trace format '{trace_format}'")
+        self.close()
+        with self._lock:
+            self._file = open(path, 'w')
+            self.path = path
+            self.format = trace_format
+            if trace_format == "chrome":
+                self._file.write("[\n")
+        atexit.register(self.close)
+    
+    def close(self):
+        """Finish and close the trace file."""
+        with self._lock:
+            if self._file is None:
+                return
+            if self.format == "chrome":
+                # Process name so the viewer labels the timeline
+                self._file.write(json.dumps({"name": "process_name", "ph": "M", "pid": os.getpid(),
+                                             "args": {"name": "schedule1_rename_tool"}}) + "\n]\n")
+            self._file.close()
+            self._file = None
+    
+    @contextmanager
+    def span(self, name, **args):
+        """Time the enclosed block; yields the TraceSpan so callers can add() counts."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        span = TraceSpan(name, len(stack), args)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.start
+            stack.pop()
+            self._finish(span)
+    
+    def _finish(self, span):
+        """Keep a finished span and write it to the trace file."""
+        with self._lock:
+            self._seq += 1
+            span.seq = self._seq
+            self.spans.append(span)
+            if self._file is None:
+                return
+            
+            if self.format == "chrome":
+                event = {"name": span.name, "ph": "X", "pid": os.getpid(), "tid": span.thread,
+                         "ts": round(span.start * 1e6), "dur": round(span.duration * 1e6),
+                         "args": dict(span.args, files=span.files, bytes=span.bytes)}
+                self._file.write(json.dumps(event) + ",\n")
+            else:
+                record = {"name": span.name, "start": round(self._epoch + span.start, 6),
+                          "duration_ms": round(span.duration * 1000, 3), "files": span.files,
+                          "bytes": span.bytes, "depth": span.depth, "thread": span.thread}
+                record.update(span.args)
+                self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+    
+    def mark(self):
+        """A position to collect later spans from, see spans_since()."""
+        return self._seq
+    
+    def spans_since(self, mark):
+        """Spans finished after mark, in the order they finished."""
+        with self._lock:
+            return [span for span in self.spans if span.seq > mark]
+    
+    @staticmethod
+    def summarize(spans, max_depth=1):
+        """Short per-operation timing text, e.g. "detail_scan 120 ms (1234 files, 3.4 MB)"."""
+        totals = {}
+        for span in spans:
+            if span.depth > max_depth:
+                continue
+            total = totals.setdefault(span.name, [0.0, 0, 0])
+            total[0] += span.duration
+            total[1] += span.files
+            total[2] += span.bytes
+        
+        parts = []
+        for name, (duration, files, size) in totals.items():
+            text = f"{name} {duration * 1000:.0f} ms"
+            counts = []
+            if files:
+                counts.append(f"{files} file{'s' if files != 1 else ''}")
+            if size:
+                counts.append(f"{size / 1024 / 1024:.1f} MB" if size >= 1024 * 1024 else f"{size / 1024:.1f} KB")
+            if counts:
+                text += f" ({', '.join(counts)})"
+            parts.append(text)
+        return " | ".join(parts)
+
+# Shared by the tool, the GUI and the command line
+tracer = Tracer()
+
+class ProductReferenceIndex:
+    """Maps each product ID to every place it is referenced in Products.json.
+    
+    A location is a (section, position, field) tuple, e.g.
+    ("MixRecipes", 12, "Output") or ("DiscoveredProducts", 3, None).
+    """
+    
+    # Sections holding plain lists of product IDs
+    LIST_SECTIONS = ("DiscoveredProducts", "ListedProducts", "FavouritedProducts")
+    # Sections holding dicts, with the fields that hold product IDs
+    RECORD_SECTIONS = (
+        ("MixRecipes", ("Product", "Mixer", "Output")),
+        ("ProductPrices", ("String",)),
+    )
+    
+    def __init__(self, products_data):
+        """Build the index with a single walk over products_data."""
+        self.products_data = products_data
+        self.locations = {}
+        
+        for section in self.LIST_SECTIONS:
+            for position, product_id in enumerate(products_data.get(section, [])):
+                self._add(product_id, (section, position, None))
+        
+        for section, fields in self.RECORD_SECTIONS:
+            for position, entry in enumerate(products_data.get(section, [])):
+                for field in fields:
+                    if field in entry:
+                        self._add(entry[field], (section, position, field))
+    
+    def _add(self, product_id, location):
+        """Record one location for a product ID."""
+        locations = self.locations.get(product_id)
+        if locations is None:
+            self.locations[product_id] = [location]
+        else:
+            locations.append(location)
+    
+    def add_entry(self, section, position):
+        """Index an entry appended to a section after the index was built."""
+        entry = self.products_data[section][position]
+        if section in self.LIST_SECTIONS:
+            self._add(entry, (section, position, None))
+            return
+        for field in dict(self.RECORD_SECTIONS)[section]:
+            if field in entry:
+                self._add(entry[field], (section, position, field))
+    
+    def find(self, product_id):
+        """Get every location referencing a product ID."""
+        return list(self.locations.get(product_id, ()))
+    
+    def is_discovered(self, product_id):
+        """Check whether a product ID is in DiscoveredProducts."""
+        return any(location[0] == "DiscoveredProducts"
+                   for location in self.locations.get(product_id, ()))
+    
+    def rename(self, id_map):
+        """Rewrite every reference to the IDs in id_map and keep the index in step.
+        
+        Returns the number of references rewritten.
+        """
+        # Detach all affected locations first so swapped IDs don't mix
+        moved = [(new_id, self.locations.pop(old_id, [])) for old_id, new_id in id_map.items()]
+        
+        count = 0
+        for new_id, locations in moved:
+            for section, position, field in locations:
+                if field is None:
+                    self.products_data[section][position] = new_id
+                else:
+                    self.products_data[section][position][field] = new_id
+                self._add(new_id, (section, position, field))
+            count += len(locations)
+        
+        return count
+
+class RecipeGraph:
+    """Forward and reverse adjacency of the mix recipes in Products.json.
+    
+    Edges are kept as positions in MixRecipes, so the IDs are always read
+    from the recipes themselves (which ProductReferenceIndex rewrites) and
+    a rename only has to move the adjacency lists of the renamed IDs.
+    Ancestor and descendant sets are memoized until the next rename.
+    """
+    
+    def __init__(self, products_data):
+        """Build the adjacency with a single walk over MixRecipes."""
+        self.recipes = products_data.get("MixRecipes", [])
+        # product id -> positions of the recipes it is mixed in, and of those producing it
+        self.inputs = {}
+        self.outputs = {}
+        for position, recipe in enumerate(self.recipes):
+            self.inputs.setdefault(recipe.get("Product"), []).append(position)
+            self.outputs.setdefault(recipe.get("Output"), []).append(position)
+        self._ancestors = {}
+        self._descendants = {}
+    
+    def mixes_into(self, product_id):
+        """(mixer, output) for every recipe the product is mixed in."""
+        recipes = self.recipes
+        return [(recipes[position].get("Mixer"), recipes[position].get("Output"))
+                for position in self.inputs.get(product_id, ())]
+    
+    def made_from(self, product_id):
+        """(product, mixer) for every recipe producing the product."""
+        recipes = self.recipes
+        return [(recipes[position].get("Product"), recipes[position].get("Mixer"))
+                for position in self.outputs.get(product_id, ())]
+    
+    def ancestors(self, product_id):
+        """Every product the given one can be made from, directly or not."""
+        return self._closure(product_id, self.outputs, "Product", self._ancestors)
+    
+    def descendants(self, product_id):
+        """Every product that can be made from the given one, directly or not."""
+        return self._closure(product_id, self.inputs, "Output", self._descendants)
+    
+    def _closure(self, product_id, edges, field, memo):
+        """Products reachable from product_id, reusing the memoized sets of those on the way."""
+        found = memo.get(product_id)
+        if found is not None:
+            return found
+        
+        recipes = self.recipes
+        reached = set()
+        pending = [product_id]
+        while pending:
+            current = pending.pop()
+            for position in edges.get(current, ()):
+                other = recipes[position].get(field)
+                if other in reached:
+                    continue
+                reached.add(other)
+                known = memo.get(other)
+                if known is not None:
+                    # Everything beyond a memoized product is already known
+                    reached.update(known)
+                else:
+                    pending.append(other)
+        
+        found = memo[product_id] = frozenset(reached)
+        return found
+    
+    def rename(self, id_map):
+        """Follow the IDs in id_map after the recipes themselves were rewritten."""
+        for edges in (self.inputs, self.outputs):
+            # Detach first so swapped IDs don't mix
+            moved = [(new_id, edges.pop(old_id)) for old_id, new_id in id_map.items() if old_id in edges]
+            for new_id, positions in moved:
+                edges[new_id] = positions
+        self._ancestors.clear()
+        self._descendants.clear()
+
+# Bulk price operations: set to a price, scale by a percentage, round to a multiple
+PRICE_OPERATIONS = ("set", "scale", "round")
+
+def apply_price_operation(prices, operation, value):
+    """New prices for a list of current prices (None = no price yet), in one pass.
+    
+    "set" gives every product the price value, "scale" changes prices by
+    value percent and "round" rounds them to the nearest multiple of value.
+    Products without a price only get one from "set". Prices never go
+    below zero.
+    """
+    if operation == "set":
+        price = max(0, int(round(value)))
+        return [price] * len(prices)
+    if operation == "scale":
+        factor = (100 + value) / 100
+        return [None if price is None else max(0, int(round(price * factor))) for price in prices]
+    if operation == "round":
+        if value <= 0:
+            raise ValueError("round needs a positive step")
+        return [None if price is None else max(0, int(round(price / value) * value)) for price in prices]
+    raise ValueError(f"unknown price operation '{operation}'")
+
+class ProductPriceIndex:
+    """Maps product IDs to their entries in ProductPrices.
+    
+    Duplicate entries for one product are all kept in step; get() reads the
+    first. New entries are appended, so existing positions never move.
+    """
+    
+    def __init__(self, products_data):
+        """Build the index with a single walk over ProductPrices."""
+        self.products_data = products_data
+        self.positions = {}
+        for position, entry in enumerate(products_data.get("ProductPrices", [])):
+            self.positions.setdefault(entry.get("String"), []).append(position)
+    
+    def get(self, product_id):
+        """The price of a product, or None if it has none."""
+        positions = self.positions.get(product_id)
+        if not positions:
+            return None
+        return self.products_data["ProductPrices"][positions[0]].get("Int")
+    
+    def set(self, product_id, price):
+        """Set a product's price; returns the position of a new entry, or None if it had one."""
+        positions = self.positions.get(product_id)
+        entries = self.products_data.setdefault("ProductPrices", [])
+        if not positions:
+            self.positions[product_id] = [len(entries)]
+            entries.append({"String": product_id, "Int": price})
+            return len(entries) - 1
+        for position in positions:
+            entries[position]["Int"] = price
+        return None
+    
+    def rename(self, id_map):
+        """Follow the IDs in id_map after the entries themselves were rewritten."""
+        moved = [(new_id, self.positions.pop(old_id)) for old_id, new_id in id_map.items()
+                 if old_id in self.positions]
+        for new_id, positions in moved:
+            self.positions[new_id] = positions
+
+# Property lists shared by every product with the same properties
+_property_sets = {}
+
+def intern_properties(properties):
+    """Get a shared tuple of interned strings for a product's properties."""
+    key = tuple(sys.intern(prop) for prop in properties)
+    return _property_sets.setdefault(key, key)
+
+class ProductRecord:
+    """Details of one created product.
+    
+    Slotted so a catalog of 100k products doesn't carry 100k dicts; type and
+    properties are interned and shared between products.
+    """
+    
+    __slots__ = ("id", "name", "type", "properties")
+    
+    def __init__(self, product_id, name, product_type, properties):
+        self.id = product_id
+        self.name = name
+        self.type = product_type
+        self.properties = properties
+    
+    def as_dict(self):
+        """The record as a plain dict, e.g. for JSON output."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "properties": list(self.properties)
+        }
+
+class ProductCatalog:
+    """Product records by row, in ID order, with an ID to row lookup.
+    
+    Rows never move: a removed product leaves None behind and new products
+    are appended, so row numbers held by the filter index and the product
+    list stay valid while the catalog is updated in place.
+    """
+    
+    def __init__(self, records=()):
+        """Build a catalog from ProductRecords."""
+        self.records = sorted(records, key=lambda record: record.id)
+        self.row_of = {record.id: row for row, record in enumerate(self.records)}
+    
+    def __len__(self):
+        return len(self.row_of)
+    
+    def __iter__(self):
+        return (record for record in self.records if record is not None)
+    
+    def __getitem__(self, row):
+        return self.records[row]
+    
+    def __contains__(self, product_id):
+        return product_id in self.row_of
+    
+    def get(self, product_id):
+        """Get a product's record, or None."""
+        row = self.row_of.get(product_id)
+        return None if row is None else self.records[row]
+    
+    def row(self, product_id):
+        """Get a product's row, or None."""
+        return self.row_of.get(product_id)
+    
+    def ids(self):
+        """All product IDs, sorted."""
+        return sorted(self.row_of)
+    
+    def put(self, record):
+        """Replace a product's record, or append it if it is new. Returns its row."""
+        row = self.row_of.get(record.id)
+        if row is None:
+            row = len(self.records)
+            self.records.append(record)
+            self.row_of[record.id] = row
+        else:
+            self.records[row] = record
+        return row
+    
+    def remove(self, product_id):
+        """Drop a product, leaving its row empty. Returns the row."""
+        row = self.row_of.pop(product_id)
+        self.records[row] = None
+        return row
+
+# A JSON string token, escapes included
+_JSON_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+
+class ProductsJsonPatcher:
+    """Renames product IDs by editing the original Products.json bytes.
+    
+    The tokens of the renamed IDs are found in the original bytes, plus the
+    tokens earlier renames moved to them, and must add up to the references
+    ProductReferenceIndex knows. A rename only records new tokens for those
+    spans, and render() copies the untouched bytes between them, so
+    everything else in the file stays byte-for-byte the same.
+    
+    Up to SEARCH_IDS IDs are each found with a byte search of the file;
+    bigger batches scan every string token of the file once instead. Either
+    way a rename reads the whole file, but never parses or serializes it.
+    """
+    
+    # Past this many IDs one pass over all string tokens beats a search per ID
+    SEARCH_IDS = 16
+    
+    def __init__(self, raw):
+        """Wrap the raw bytes Products.json was read as."""
+        self.raw = raw
+        # Replaced tokens: start -> (end, new token)
+        self.edits = {}
+        # ID -> (start, end) spans of replaced tokens that now hold it
+        self.moved = {}
+    
+    def _find_tokens(self, product_ids):
+        """Get {id: spans of every token holding it}, or None if one can't be found safely."""
+        tokens = {}
+        for product_id in product_ids:
+            token = json.dumps(product_id).encode("ascii")
+            if b"\\" in token:
+                # The file may escape it differently
+                return None
+            tokens[token] = product_id
+        
+        raw = self.raw
+        if len(tokens) <= self.SEARCH_IDS:
+            matches = ((start, token) for token in tokens for start in self._search(token))
+        else:
+            matches = ((match.start(), match.group()) for match in _JSON_STRING_RE.finditer(raw)
+                       if match.group() in tokens)
+        
+        found = {product_id: list(self.moved.get(product_id, ())) for product_id in product_ids}
+        for start, token in matches:
+            if start in self.edits:
+                continue
+            end = start + len(token)
+            # Only a value in a list or object; anything else (a key, or
+            # bytes straddling two strings) can't be told apart safely
+            before = start - 1
+            while before >= 0 and raw[before] in b" \t\r\n":
+                before -= 1
+            after = end
+            while after < len(raw) and raw[after] in b" \t\r\n":
+                after += 1
+            if before < 0 or raw[before] not in b"[,:" or after == len(raw) or raw[after] not in b",]}":
+                return None
+            found[tokens[token]].append((start, end))
+        return found
+    
+    def _search(self, token):
+        """Yield every position of token in the original bytes."""
+        start = self.raw.find(token)
+        while start >= 0:
+            yield start
+            start = self.raw.find(token, start + 1)
+    
+    def rename(self, reference_index, id_map):
+        """Record new tokens for every reference to the IDs in id_map.
+        
+        Call before reference_index.rename(). Returns the number of tokens
+        replaced, or None if the file can't be patched safely.
+        """
+        found = self._find_tokens(id_map)
+        if found is None:
+            return None
+        for old_id, spans in found.items():
+            # Any other token with the same text (e.g. a plain value) shows up as an extra
+            if len(spans) != len(reference_index.locations.get(old_id, ())):
+                return None
+        
+        # Detach every moved span first so swapped IDs don't mix
+        for old_id in id_map:
+            self.moved.pop(old_id, None)
+        for old_id, new_id in id_map.items():
+            token = json.dumps(new_id).encode("ascii")
+            for start, end in found[old_id]:
+                self.edits[start] = (end, token)
+            self.moved.setdefault(new_id, []).extend(found[old_id])
+        
+        return sum(len(spans) for spans in found.values())
+    
+    def render(self):
+        """The patched file contents as bytes."""
+        raw = memoryview(self.raw)
+        pieces = []
+        position = 0
+        for start in sorted(self.edits):
+            end, token = self.edits[start]
+            pieces.append(raw[position:start])
+            pieces.append(token)
+            position = end
+        pieces.append(raw[position:])
+        return b"".join(pieces)
+
+class ProductFilterIndex:
+    """Trigram index for substring filtering over product ID, name and properties.
+    
+    Queries of three or more characters only look at rows sharing all of the
+    query's trigrams. A query that extends the previous one is answered from
+    the previous result, so typing narrows the result set incrementally.
+    Rows can be added, updated and removed (removed rows never match).
+    """
+    
+    def __init__(self, products):
+        """Index a list of ProductRecords; None entries are rows that never match."""
+        self.haystacks = []
+        self.trigrams = {}
+        self.removed = set()
+        
+        for product in products:
+            if product is None:
+                self.remove(self.add(None))
+            else:
+                self.add(product)
+        
+        self._last_query = ""
+        self._last_result = range(len(self.haystacks))
+    
+    def _haystack(self, product):
+        """The lowercase text a product is matched against."""
+        if product is None:
+            return ""
+        return "\n".join((product.id, product.name) + product.properties).lower()
+    
+    def _index_trigrams(self, row, haystack, skip=frozenset()):
+        """Add a row to the postings of every trigram in haystack not in skip."""
+        for trigram in {haystack[i:i + 3] for i in range(len(haystack) - 2)} - skip:
+            postings = self.trigrams.get(trigram)
+            if postings is None:
+                self.trigrams[trigram] = [row]
+            else:
+                postings.append(row)
+    
+    def add(self, product):
+        """Index a new product and return its row."""
+        row = len(self.haystacks)
+        haystack = self._haystack(product)
+        self.haystacks.append(haystack)
+        self._index_trigrams(row, haystack)
+        self._last_query = None
+        return row
+    
+    def update(self, row, product):
+        """Re-index a row whose product details changed."""
+        old_haystack = self.haystacks[row] or ""
+        haystack = self._haystack(product)
+        self.haystacks[row] = haystack
+        self.removed.discard(row)
+        # Stale postings only add candidates, which the substring check rejects
+        self._index_trigrams(row, haystack, {old_haystack[i:i + 3] for i in range(len(old_haystack) - 2)})
+        self._last_query = None
+    
+    def remove(self, row):
+        """Stop a row from matching."""
+        self.haystacks[row] = None
+        self.removed.add(row)
+        self._last_query = None
+    
+    def search(self, text):
+        """Get the rows matching a filter text, in index order."""
+        query = text.strip().lower()
+        if not query:
+            result = range(len(self.haystacks))
+            if self.removed:
+                result = [row for row in result if row not in self.removed]
+        else:
+            if self._last_query and self._last_query in query:
+                # Narrowing: every match is already in the previous result
+                candidates = self._last_result
+            elif len(query) >= 3:
+                candidates = self._trigram_candidates(query)
+            else:
+                candidates = range(len(self.haystacks))
+            
+            haystacks = self.haystacks
+            result = [row for row in candidates
+                      if haystacks[row] is not None and query in haystacks[row]]
+        
+        self._last_query = query
+        self._last_result = result
+        return result
+    
+    def _trigram_candidates(self, query):
+        """Rows containing every trigram of the query."""
+        postings = []
+        for trigram in {query[i:i + 3] for i in range(len(query) - 2)}:
+            rows = self.trigrams.get(trigram)
+            if rows is None:
+                return []
+            postings.append(rows)
+        
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for rows in postings[1:]:
+            candidates.intersection_update(rows)
+            if not candidates:
+                return []
+        
+        return sorted(candidates)
+
+class RenamePlan:
+    """Everything a batch rename will do, worked out before anything is written.
+    
+    Made by Schedule1ModTool.plan_renames() and carried out, unchanged, by
+    Schedule1ModTool.apply_plan(). It holds the per-entry results (errors
+    are already filled in for entries that can't be applied), the new
+    content of every product file, the ID changes for Products.json with
+    the number of references per section, and the bytes to be written.
+    """
+    
+    # Cost model for estimate_seconds(), scaled by measured commits when there are any
+    SECONDS_PER_FILE = 0.002
+    BYTES_PER_SECOND = 50 * 1024 * 1024
+    SECONDS_PER_REFERENCE = 0.000002
+    
+    def __init__(self, renames):
+        self.renames = [tuple(item) for item in renames]
+        self.results = [{"old_id": item[0], "new_id": item[1], "success": False, "error": None}
+                        for item in self.renames]
+        # original id -> (new_id, new_name, result indexes)
+        self.changes = {}
+        # path -> new content, and paths to delete
+        self.writes = {}
+        self.deletes = []
+        # original id -> new id, for the references in Products.json
+        self.id_map = {}
+        # original id -> display name before the rename, for the undo history
+        self.old_names = {}
+        # How apply_plan() updates the undo history: "record", "undo" or "redo"
+        self.history_action = "record"
+        self.history_entry = None
+        self.references = {}
+        self.products_json_bytes = 0
+        self.backup_needed = False
+        # Load generation of the save the plan was made against
+        self.generation = None
+    
+    @property
+    def error_count(self):
+        return sum(1 for result in self.results if result["error"])
+    
+    @property
+    def reference_count(self):
+        return sum(self.references.values())
+    
+    @property
+    def bytes_to_write(self):
+        """Bytes of product files plus the (estimated) size of Products.json."""
+        return sum(len(content) for content in self.writes.values()) + self.products_json_bytes
+    
+    @property
+    def files_to_write(self):
+        return len(self.writes) + (1 if self.id_map else 0)
+    
+    def file_renames(self):
+        """(old file name, new file name) for every product whose ID changes."""
+        return [(f"{original_id}.json", f"{new_id}.json") for original_id, new_id in self.id_map.items()]
+    
+    def estimate_seconds(self):
+        """Expected time to apply the plan, from its size and the commits timed so far."""
+        def model(files, size):
+            return files * self.SECONDS_PER_FILE + size / self.BYTES_PER_SECOND
+        
+        # Scale the model by how fast earlier commits actually were on this machine
+        scale = 1.0
+        commits = [span for span in tracer.spans if span.name == "commit_files" and span.files]
+        if commits:
+            expected = sum(model(span.files, span.bytes) for span in commits)
+            if expected > 0:
+                scale = sum(span.duration for span in commits) / expected
+        
+        return (model(self.files_to_write + len(self.deletes), self.bytes_to_write) * scale
+                + self.reference_count * self.SECONDS_PER_REFERENCE)
+    
+    def to_dict(self):
+        """The plan as plain data, for export."""
+        return {
+            "renames": len(self.renames),
+            "applicable": len(self.renames) - self.error_count,
+            "errors": [{"old_id": result["old_id"], "new_id": result["new_id"], "error": result["error"]}
+                       for result in self.results if result["error"]],
+            "file_renames": [{"from": old_name, "to": new_name} for old_name, new_name in self.file_renames()],
+            "files_written": self.files_to_write,
+            "files_deleted": len(self.deletes),
+            "references": dict(self.references),
+            "bytes_written": self.bytes_to_write,
+            "backup": self.backup_needed,
+            "estimated_seconds": round(self.estimate_seconds(), 3),
+        }
+    
+    def summary(self, limit=15):
+        """A short human-readable description of the plan."""
+        lines = [f"{len(self.renames) - self.error_count} of {len(self.renames)} rename(s) can be applied"]
+        for old_name, new_name in self.file_renames()[:limit]:
+            lines.append(f"  {old_name} -> {new_name}")
+        if len(self.id_map) > limit:
+            lines.append(f"  ... and {len(self.id_map) - limit} more")
+        
+        sections = ", ".join(f"{section} {count}" for section, count in self.references.items() if count)
+        lines.append(f"References rewritten: {self.reference_count}" + (f" ({sections})" if sections else ""))
+        lines.append(f"Files written: {self.files_to_write}, deleted: {len(self.deletes)}, "
+                     f"about {self.bytes_to_write / 1024:.1f} KB")
+        if self.backup_needed:
+            lines.append("A backup will be made first")
+        lines.append(f"Estimated time: {self.estimate_seconds():.2f} s")
+        return "\n".join(lines)
+
+# Undo history log kept in the save folder, how many renames it remembers,
+# and how many lines the log may grow to before it is rewritten
+HISTORY_FILE = ".renamer_history.jsonl"
+HISTORY_LIMIT = 50
+HISTORY_COMPACT_LINES = 4 * HISTORY_LIMIT
+
+class RenameHistory:
+    """Undo and redo stacks of applied renames, stored with the save.
+    
+    Each entry is a dict with "time", "label" and "changes"; a change holds
+    "old_id", "new_id", "old_name", "new_name" and the "locations" in
+    Products.json that were rewritten, packed by pack_locations().
+    
+    The file is a log of one JSON object per line: a rename recorded,
+    undone or redone ("action" "record", "undo" or "redo"), or the whole
+    "state". Each rename appends its line in the same journaled commit as
+    the rename, so the log always matches the files and a step costs the
+    size of its own change. Once the log is long it is rewritten as a
+    single state line (see dumps()).
+    """
+    
+    def __init__(self, undo=None, redo=None, limit=HISTORY_LIMIT, lines=0):
+        self.undo = undo or []
+        self.redo = redo or []
+        self.limit = limit
+        # Lines in the log file
+        self.lines = lines
+    
+    @classmethod
+    def load(cls, path):
+        """Replay a history log; a missing file gives an empty history and damaged lines are skipped."""
+        history = cls()
+        lines = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                        action = record["action"]
+                        if action == "state":
+                            history = cls(record["undo"], record["redo"])
+                        elif action == "record":
+                            history = history.after(action, record["entry"])
+                        else:
+                            history = history.after(action, (history.undo if action == "undo" else history.redo)[-1])
+                    except (ValueError, KeyError, IndexError, TypeError):
+                        pass
+        except OSError:
+            pass
+        history.lines = lines
+        return history
+    
+    @staticmethod
+    def log_line(action, entry):
+        """The log line for a rename ("record"), undo or redo of entry."""
+        record = {"action": action}
+        if action == "record":
+            record["entry"] = entry
+        return json.dumps(record, separators=(",", ":")) + "\n"
+    
+    def dumps(self):
+        """The whole history as a log of one line."""
+        return json.dumps({"action": "state", "undo": self.undo, "redo": self.redo}, separators=(",", ":")) + "\n"
+    
+    def after(self, action, entry):
+        """The history after a rename ("record"), undo or redo of entry was applied."""
+        if action == "undo":
+            return RenameHistory(self.undo[:-1], self.redo + [entry], self.limit, self.lines + 1)
+        if action == "redo":
+            return RenameHistory(self.undo + [entry], self.redo[:-1], self.limit, self.lines + 1)
+        # A new rename starts a new branch, the old redo steps no longer apply
+        return RenameHistory((self.undo + [entry])[-self.limit:], [], self.limit, self.lines + 1)
+    
+    @staticmethod
+    def pack_locations(locations):
+        """Group (section, position, field) locations as {"section" or "section.field": [positions]}."""
+        packed = {}
+        for section, position, field in locations:
+            packed.setdefault(section if field is None else f"{section}.{field}", []).append(position)
+        return packed
+    
+    @staticmethod
+    def unpack_locations(packed):
+        """The (section, position, field) locations of pack_locations() output."""
+        for key, positions in packed.items():
+            section, _, field = key.partition(".")
+            for position in positions:
+                yield section, position, field or None
+
+class IntegrityReport:
+    """Problems found by Schedule1ModTool.check_integrity().
+    
+    Each issue is a dict with "kind" (one of KINDS), "product_id", the
+    "section", "position" and "field" it was found at (None for product
+    files) and a "message". Only the first MAX_ISSUES are kept, but all of
+    them are counted per kind.
+    """
+    
+    KINDS = ("duplicate_id", "dangling_reference", "orphaned_file", "id_mismatch", "unreadable_file")
+    MAX_ISSUES = 1000
+    
+    def __init__(self):
+        self.issues = []
+        self.counts = dict.fromkeys(self.KINDS, 0)
+        self.products = 0
+        self.files = 0
+    
+    def add(self, kind, product_id, message, section=None, position=None, field=None):
+        """Record one problem."""
+        self.counts[kind] += 1
+        if len(self.issues) < self.MAX_ISSUES:
+            self.issues.append({"kind": kind, "product_id": product_id, "section": section,
+                                "position": position, "field": field, "message": message})
+    
+    @property
+    def issue_count(self):
+        return sum(self.counts.values())
+    
+    @property
+    def ok(self):
+        return self.issue_count == 0
+    
+    def summary(self, limit=15):
+        """A short human-readable account of the check."""
+        if self.ok:
+            return f"No problems found in {self.products} products and {self.files} product files"
+        
+        lines = [f"{self.issue_count} problem(s) in {self.products} products and {self.files} product files: " +
+                 ", ".join(f"{count} {kind.replace('_', ' ')}" for kind, count in self.counts.items() if count)]
+        for issue in self.issues[:limit]:
+            place = issue["section"] or "CreatedProducts"
+            if issue["position"] is not None:
+                place += f"[{issue['position']}]"
+            if issue["field"]:
+                place += f".{issue['field']}"
+            lines.append(f"  {place}: '{issue['product_id']}' - {issue['message']}")
+        if self.issue_count > limit:
+            lines.append(f"  ... and {self.issue_count - limit} more")
+        return "\n".join(lines)
+    
+    def to_dict(self):
+        return {"ok": self.ok, "products": self.products, "files": self.files,
+                "counts": dict(self.counts), "issues": self.issues}
+
+# Below this many products the thread pool costs more than it saves
+PARALLEL_LOAD_THRESHOLD = 256
+# Product files read per thread pool task
+PARALLEL_LOAD_BATCH = 64
+
+# Items processed between progress callbacks in long loops
+PROGRESS_INTERVAL = 256
+
+# Write-ahead journal kept in the save folder while a commit is in progress
+JOURNAL_FILE = ".renamer_journal.json"
+STAGED_SUFFIX = ".renamer_tmp"
+
 class Schedule1ModTool:
-    def __init__(self, save_path=None):
+    def __init__(self, save_path=None, max_workers=None, backup_mode="copy", backup_keep=10,
+                 json_style="preserve"):
         """Initialize the mod tool with the path to the save folder."""
         self.save_path = save_path
+        # Threads used to read CreatedProducts files (None = pick automatically, 1 = serial)
+        self.max_workers = max_workers
+        # "copy" makes a full <save>_backup_<timestamp> copy, "snapshot" an
+        # incremental snapshot under <save>_snapshots keeping backup_keep of them
+        self.backup_mode = backup_mode
+        self.backup_keep = backup_keep
+        # Output style of rewritten files, see JsonSerializer
+        self.serializer = JsonSerializer(json_style)
         self.products_data = None
+        self._products_indent = DEFAULT_JSON_INDENT
+        # Edits Products.json in place on renames, None when it must be re-serialized
+        self._products_patcher = None
+        self._products_size = 0
+        # (path, mtime, size) of Products.json as last read or written here
+        self._products_stat = None
+        # Bumped on every load and applied plan, so stale plans are refused
+        self._generation = 0
+        self.reference_index = None
+        self.recipe_graph = None
+        self.price_index = None
         self.backup_made = False
+        self.last_backup_path = None
+        self.last_bulk_results = []
+        # RenameHistory of the save, read on first use
+        self.history = None
+        # Run check_integrity() after every applied rename, keeping the report here
+        self.check_after_commit = False
+        self.last_integrity_report = None
+        # ProductCatalog from the last get_product_details(), shared with the GUI
+        self.catalog = None
+        # ProductIdAllocator for new IDs, built on first use
+        self.id_allocator = None
+        # Parsed CreatedProducts files keyed by path, validated by (mtime, size)
+        self._product_cache = {}
         
     def set_save_path(self, path):
         """Set the path to the save folder."""
+        if path != self.save_path:
+            # A backup of the previous save doesn't cover this one
+            self.backup_made = False
+            self.catalog = None
+            self.id_allocator = None
+            self.history = None
         self.save_path = path
         
-    def make_backup(self):
-        """Create a backup of the save folder."""
+    def make_backup(self, progress=None):
+        """Create a backup of the save folder.
+        
+        progress, if given, is called as progress(files_done, None) and may
+        raise OperationCancelled, in which case the partial backup is removed.
+        """
         if self.backup_made:
             return True
             
         if not self.save_path or not os.path.exists(self.save_path):
             return False
+        
+        if self.backup_mode == "snapshot":
+            snapshot_path = self.make_snapshot(progress)
+            if snapshot_path is None:
+                return False
+            self.backup_made = True
+            self.last_backup_path = snapshot_path
+            return True
             
         backup_path = f"{self.save_path}_backup_{self._get_timestamp()}"
+        
         try:
-            shutil.copytree(self.save_path, backup_path)
+            with tracer.span("backup_copy") as span:
+                def copy_file(source, target):
+                    shutil.copy2(source, target)
+                    span.add(files=1, bytes=os.path.getsize(target))
+                    if progress:
+                        progress(span.files, None)
+                
+                shutil.copytree(self.save_path, backup_path, copy_function=copy_file)
             self.backup_made = True
+            self.last_backup_path = backup_path
             return True
+        except OperationCancelled:
+            shutil.rmtree(backup_path, ignore_errors=True)
+            raise
         except Exception as e:
             return False
     
+    def _get_snapshot_root(self):
+        """Get the folder that holds the snapshots of the current save."""
+        return f"{os.path.normpath(self.save_path)}_snapshots"
+    
+    def list_snapshots(self):
+        """List snapshot folders of the current save, oldest first."""
+        if not self.save_path:
+            return []
+            
+        snapshot_root = self._get_snapshot_root()
+        try:
+            with os.scandir(snapshot_root) as entries:
+                names = [entry.name for entry in entries if entry.is_dir()]
+        except OSError:
+            return []
+        
+        # Names are <timestamp> or <timestamp>_<n> for several in one second
+        def snapshot_order(name):
+            suffix = name[16:]
+            return (name[:15], int(suffix) if suffix.isdigit() else 0)
+        names.sort(key=snapshot_order)
+        
+        return [os.path.join(snapshot_root, name) for name in names]
+    
+    def make_snapshot(self, progress=None):
+        """Create an incremental snapshot of the save folder.
+        
+        Files whose size and modification time match the previous snapshot
+        are hard-linked to it instead of copied, so a snapshot only costs the
+        files that changed. Old snapshots beyond backup_keep are pruned.
+        Returns the snapshot path, or None on failure.
+        """
+        if not self.save_path or not os.path.exists(self.save_path):
+            return None
+        
+        snapshots = self.list_snapshots()
+        previous = snapshots[-1] if snapshots else None
+        
+        # Several snapshots within one second get an increasing _<n> suffix
+        snapshot_name = self._get_timestamp()
+        if previous is not None:
+            previous_name = os.path.basename(previous)
+            if previous_name[:15] == snapshot_name:
+                previous_suffix = previous_name[16:]
+                snapshot_name += f"_{int(previous_suffix) + 1 if previous_suffix.isdigit() else 1}"
+        snapshot_path = os.path.join(self._get_snapshot_root(), snapshot_name)
+        
+        can_link = previous is not None
+        linked_or_copied = 0
+        try:
+            # files and bytes count what was copied, linked files only show in the "linked" arg
+            with tracer.span("backup_snapshot", linked=0) as span:
+                for folder, _, files in os.walk(self.save_path):
+                    relative_folder = os.path.relpath(folder, self.save_path)
+                    target_folder = os.path.normpath(os.path.join(snapshot_path, relative_folder))
+                    os.makedirs(target_folder, exist_ok=True)
+                    
+                    for file_name in files:
+                        source = os.path.join(folder, file_name)
+                        target = os.path.join(target_folder, file_name)
+                        
+                        if can_link:
+                            earlier = os.path.normpath(os.path.join(previous, relative_folder, file_name))
+                            if self._same_file_contents(source, earlier):
+                                try:
+                                    os.link(earlier, target)
+                                    span.args["linked"] += 1
+                                    continue
+                                except OSError:
+                                    # File system without hard links, copy from now on
+                                    can_link = False
+                        
+                        shutil.copy2(source, target)
+                        span.add(files=1, bytes=os.path.getsize(target))
+                    
+                    if progress:
+                        linked_or_copied += len(files)
+                        progress(linked_or_copied, None)
+        except OperationCancelled:
+            shutil.rmtree(snapshot_path, ignore_errors=True)
+            raise
+        except Exception:
+            shutil.rmtree(snapshot_path, ignore_errors=True)
+            return None
+        
+        self.prune_snapshots()
+        return snapshot_path
+    
+    def _same_file_contents(self, path, other_path):
+        """Cheap unchanged-file check by size and modification time."""
+        try:
+            stat = os.stat(path)
+            other_stat = os.stat(other_path)
+        except OSError:
+            return False
+        
+        # copy2 carries the mtime over, so an untouched file matches exactly;
+        # any rounding by the file system only causes an unnecessary copy
+        return (stat.st_size == other_stat.st_size
+                and stat.st_mtime_ns == other_stat.st_mtime_ns)
+    
+    def prune_snapshots(self, keep=None):
+        """Delete all but the newest `keep` snapshots. Returns how many were removed."""
+        if keep is None:
+            keep = self.backup_keep
+        if keep is None or keep < 1:
+            return 0
+        
+        snapshots = self.list_snapshots()
+        expired = snapshots[:-keep]
+        for snapshot_path in expired:
+            # Hard links keep shared files alive for the newer snapshots
+            shutil.rmtree(snapshot_path, ignore_errors=True)
+        
+        return len(expired)
+    
     def _get_timestamp(self):
         """Get a timestamp string for backup naming."""
         return datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -52,12 +1458,44 @@ class Schedule1ModTool:
             return False
             
         try:
-            with open(products_path, 'r') as f:
-                self.products_data = json.load(f)
+            self.recover_pending_commit()
+            if self.products_data is not None and self._products_stat == self._stat_products_json():
+                # Unchanged since it was read or written here, so the parsed data,
+                # indexes, allocator, history and patcher are still current
+                return True
+            
+            # Another program (or tool instance) may have changed the product files and history
+            self.id_allocator = None
+            self.history = None
+            with tracer.span("load_products_json") as span:
+                stat = self._stat_products_json()
+                with open(products_path, 'rb') as f:
+                    raw = f.read()
+                span.add(files=1, bytes=len(raw))
+                self.products_data, self._products_indent = self._parse_json(raw)
+                self.reference_index = ProductReferenceIndex(self.products_data)
+                self.price_index = ProductPriceIndex(self.products_data)
+                # Built by get_recipe_graph() on first use
+                self.recipe_graph = None
+                self._products_patcher = ProductsJsonPatcher(raw)
+                self._products_size = len(raw)
+                self._products_stat = stat
+                self._generation += 1
             return True
         except Exception:
             return False
     
+    def _forget_products_data(self):
+        """Drop the in-memory Products.json after a failed write.
+        
+        The next use reloads it from disk, after recovery has settled the commit.
+        """
+        self.products_data = None
+        self.reference_index = None
+        self.recipe_graph = None
+        self.price_index = None
+        self.id_allocator = None
+    
     def get_product_list(self):
         """Get a list of all products."""
         if not self.products_data:
@@ -66,190 +1504,983 @@ class Schedule1ModTool:
         
         return self.products_data["DiscoveredProducts"]
     
-    def get_product_details(self):
-        """Get detailed product information with names."""
+    def product_exists(self, product_id):
+        """Check whether a product ID is in DiscoveredProducts."""
+        if not self.products_data:
+            if not self.load_products_data():
+                return False
+        
+        return self.reference_index.is_discovered(product_id)
+    
+    def get_price(self, product_id):
+        """Get a product's price from ProductPrices, or None if it has none."""
+        if self.price_index is None:
+            return None
+        return self.price_index.get(product_id)
+    
+    def update_prices(self, product_ids, operation, value, progress=None):
+        """Change the prices of many products with a single write of Products.json.
+        
+        operation is one of PRICE_OPERATIONS, see apply_price_operation().
+        IDs that are not discovered products, and products without a price
+        for "scale" and "round", are skipped. Returns (changed, skipped),
+        or False if the save could not be loaded, backed up or written.
+        """
+        if operation not in PRICE_OPERATIONS:
+            raise ValueError(f"unknown price operation '{operation}'")
+        if not self.products_data:
+            if not self.load_products_data():
+                return False
+        
+        with tracer.span("price_update", operation=operation) as span:
+            requested = list(dict.fromkeys(product_ids))
+            product_ids = [product_id for product_id in requested if self.reference_index.is_discovered(product_id)]
+            skipped = len(requested) - len(product_ids)
+            old_prices = [self.price_index.get(product_id) for product_id in product_ids]
+            new_prices = apply_price_operation(old_prices, operation, value)
+            changes = []
+            for product_id, old_price, new_price in zip(product_ids, old_prices, new_prices):
+                if new_price is None:
+                    skipped += 1
+                elif new_price != old_price:
+                    changes.append((product_id, new_price))
+            if not changes:
+                return 0, skipped
+            
+            if not self.backup_made:
+                if not self.make_backup(progress):
+                    return False
+            
+            for done, (product_id, price) in enumerate(changes):
+                if progress and done % PROGRESS_INTERVAL == 0:
+                    progress(done, len(changes))
+                added = self.price_index.set(product_id, price)
+                if added is not None:
+                    # New entries must follow later renames too
+                    self.reference_index.add_entry("ProductPrices", added)
+            
+            # The patcher only knows about ID tokens, so this write re-serializes
+            self._products_patcher = None
+            try:
+                self._commit_files({self._get_products_path(): self._serialize_products_json()})
+                size = self._reset_products_patcher()
+            except Exception:
+                self._forget_products_data()
+                return False
+            
+            self._generation += 1
+            span.add(files=1, bytes=size)
+        
+        if self.check_after_commit:
+            self.last_integrity_report = self.check_integrity()
+        return len(changes), skipped
+    
+    def get_recipe_graph(self):
+        """Get the RecipeGraph of the loaded Products.json."""
+        if not self.products_data:
+            if not self.load_products_data():
+                return None
+        if self.recipe_graph is None:
+            with tracer.span("recipe_graph"):
+                self.recipe_graph = RecipeGraph(self.products_data)
+        return self.recipe_graph
+    
+    def find_product_references(self, product_id):
+        """List the (section, position, field) locations that reference a product ID."""
+        if not self.products_data:
+            if not self.load_products_data():
+                return []
+        
+        return self.reference_index.find(product_id)
+    
+    def get_product_details(self, max_workers=None, progress=None):
+        """Load the ProductCatalog of discovered products with their names.
+        
+        The catalog is also kept as self.catalog. progress, if given, is
+        called as progress(files_read, total) and may raise
+        OperationCancelled to stop the scan.
+        """
         products = self.get_product_list()
         if not products:
-            return []
+            self.catalog = ProductCatalog()
+            return self.catalog
+            
+        with tracer.span("detail_scan") as span:
+            created_products_dir = os.path.join(self.save_path, "CreatedProducts")
+            product_files = [os.path.join(created_products_dir, f"{product_id}.json") for product_id in products]
+            infos = self._read_product_files(product_files, max_workers, progress)
+            span.add(files=len(product_files), bytes=self._cached_size(product_files))
+            
+            self.catalog = ProductCatalog(self._make_record(product_id, info)
+                                          for product_id, info in zip(products, infos))
+        return self.catalog
+    
+    def get_details_for_ids(self, product_ids):
+        """Get ProductRecords for a few IDs; unchanged files are served from the cache."""
+        created_products_dir = os.path.join(self.save_path, "CreatedProducts")
+        return [self._make_record(product_id,
+                                  self._read_product_file(os.path.join(created_products_dir, f"{product_id}.json")))
+                for product_id in product_ids]
+    
+    def _make_record(self, product_id, info):
+        """Build the record for a product from its parsed file info (or None)."""
+        if info is None:
+            return ProductRecord(product_id, product_id, "Unknown", ())
+        
+        name, product_type, properties, _ = info
+        return ProductRecord(product_id, name, product_type, properties)
+    
+    def load_created_products(self, max_workers=None):
+        """Load every file in the CreatedProducts folder concurrently.
+        
+        Unlike get_product_details() this does not need Products.json, and it
+        also returns files that are not listed in DiscoveredProducts. The
+        result is a separate ProductCatalog; self.catalog is left alone.
+        """
+        if not self.save_path:
+            return ProductCatalog()
             
-        details = []
         created_products_dir = os.path.join(self.save_path, "CreatedProducts")
+        try:
+            with os.scandir(created_products_dir) as entries:
+                product_files = sorted(entry.path for entry in entries
+                                       if entry.name.endswith(".json") and entry.is_file())
+        except OSError:
+            return ProductCatalog()
+        
+        return ProductCatalog(self._make_record(os.path.basename(product_file)[:-len(".json")], info)
+                              for product_file, info in zip(product_files, self._read_product_files(product_files, max_workers))
+                              if info is not None)
+    
+    def _read_product_files(self, product_files, max_workers=None, progress=None):
+        """Read many product files, concurrently when there are enough of them."""
+        if max_workers is None:
+            max_workers = self.max_workers
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        
+        total = len(product_files)
+        if max_workers <= 1 or total < PARALLEL_LOAD_THRESHOLD:
+            results = map(self._read_product_file, product_files)
+            pool = None
+        else:
+            # File reads are dominated by I/O latency, so threads overlap well here;
+            # batches keep the per-task overhead down when most files are cached
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+            batches = [product_files[start:start + PARALLEL_LOAD_BATCH]
+                       for start in range(0, total, PARALLEL_LOAD_BATCH)]
+            results = (info for batch in pool.map(self._read_product_batch, batches) for info in batch)
+        
+        infos = []
+        try:
+            for info in results:
+                infos.append(info)
+                if progress and len(infos) % PROGRESS_INTERVAL == 0:
+                    progress(len(infos), total)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        
+        if progress:
+            progress(total, total)
+        return infos
+    
+    def _read_product_batch(self, product_files):
+        """Read a few product files on one pool thread."""
+        return [self._read_product_file(product_file) for product_file in product_files]
+    
+    def _read_product_file(self, product_file):
+        """Get (name, type, properties, file_id) for a product file, or None if unusable.
+        
+        file_id is the file's "ID" when it differs from the file name, else None.
+        
+        Parsed results are kept in memory and only re-read when the file's
+        modification time or size changes.
+        """
+        try:
+            stat = os.stat(product_file)
+        except OSError:
+            self._product_cache.pop(product_file, None)
+            return None
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._product_cache.get(product_file)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        try:
+            product_data = self._read_json_file(product_file)[0]
+            # Types and properties repeat across products, so share one copy of each
+            file_id = product_data.get("ID")
+            if file_id == os.path.basename(product_file)[:-len(".json")]:
+                file_id = None
+            info = (product_data["Name"],
+                    sys.intern(product_data.get("DataType", "Unknown")),
+                    intern_properties(product_data.get("Properties", [])),
+                    file_id)
+        except:
+            info = None
+        
+        self._product_cache[product_file] = (signature, info)
+        return info
+    
+    def _cached_size(self, product_files):
+        """Total size of product files as of their last read."""
+        cache = self._product_cache
+        return sum(cache[path][0][1] for path in product_files if path in cache)
+    
+    def _invalidate_product_file(self, product_file):
+        """Drop a product file from the detail cache after we modify it."""
+        self._product_cache.pop(product_file, None)
+    
+    def check_integrity(self, progress=None):
+        """Check that Products.json and the CreatedProducts files agree with each other.
+        
+        Looks for duplicate IDs, references to products that are not in
+        DiscoveredProducts, product files nobody lists, files whose "ID"
+        doesn't match their name and files that can't be read. The ID sets
+        are built once and every section is walked once; product files are
+        served from the detail cache when unchanged. Returns an IntegrityReport.
+        """
+        report = IntegrityReport()
+        if not self.products_data:
+            if not self.load_products_data():
+                report.add("unreadable_file", "Products.json", "could not load Products.json", "Products.json")
+                return report
+        
+        data = self.products_data
+        with tracer.span("integrity_check") as span:
+            discovered = set()
+            for position, product_id in enumerate(data.get("DiscoveredProducts", [])):
+                if product_id in discovered:
+                    report.add("duplicate_id", product_id, "listed more than once",
+                               "DiscoveredProducts", position)
+                discovered.add(product_id)
+            report.products = len(discovered)
+            
+            for section, unknown, repeated in (
+                ("ListedProducts", "listing of an unknown product", "listed more than once"),
+                ("FavouritedProducts", "favourite of an unknown product", "favourited more than once"),
+            ):
+                seen = set()
+                for position, product_id in enumerate(data.get(section, [])):
+                    if product_id not in discovered:
+                        report.add("dangling_reference", product_id, unknown, section, position)
+                    elif product_id in seen:
+                        report.add("duplicate_id", product_id, repeated, section, position)
+                    seen.add(product_id)
+            
+            # Mixer holds an ingredient, not a product, so only Product and Output must be discovered
+            for position, recipe in enumerate(data.get("MixRecipes", [])):
+                for field in ("Product", "Output"):
+                    product_id = recipe.get(field)
+                    if product_id not in discovered:
+                        report.add("dangling_reference", product_id, "recipe uses an unknown product",
+                                   "MixRecipes", position, field)
+            
+            priced = set()
+            for position, price in enumerate(data.get("ProductPrices", [])):
+                product_id = price.get("String")
+                if product_id not in discovered:
+                    report.add("dangling_reference", product_id, "price of an unknown product",
+                               "ProductPrices", position, "String")
+                elif product_id in priced:
+                    report.add("duplicate_id", product_id, "has more than one price",
+                               "ProductPrices", position, "String")
+                priced.add(product_id)
+            
+            # Base products have no file, so only files without a product are reported
+            created_products_dir = os.path.join(self.save_path, "CreatedProducts")
+            try:
+                with os.scandir(created_products_dir) as entries:
+                    product_files = sorted(entry.path for entry in entries
+                                           if entry.name.endswith(".json") and entry.is_file())
+            except OSError:
+                product_files = []
+            report.files = len(product_files)
+            
+            infos = self._read_product_files(product_files, progress=progress)
+            for product_file, info in zip(product_files, infos):
+                product_id = os.path.basename(product_file)[:-len(".json")]
+                if product_id not in discovered:
+                    report.add("orphaned_file", product_id, "product file not in DiscoveredProducts")
+                if info is None:
+                    report.add("unreadable_file", product_id, "product file can't be read")
+                elif info[3] is not None:
+                    report.add("id_mismatch", product_id, f"file has ID '{info[3]}'")
+            
+            span.add(files=len(product_files) + 1,
+                     bytes=self._products_size + self._cached_size(product_files))
         
-        for product_id in products:
-            product_file = os.path.join(created_products_dir, f"{product_id}.json")
-            name = product_id
-            product_type = "Unknown"
-            properties = []
+        return report
+    
+    def rename_product(self, old_id, new_name):
+        """Rename a product's display name but keep the same ID."""
+        return self.change_product_ids([(old_id, old_id, new_name)])[0]["success"]
+    
+    def change_product_id(self, old_id, new_id, new_name=None):
+        """Change a product's ID and optionally its name."""
+        return self.change_product_ids([(old_id, new_id, new_name)])[0]["success"]
+    
+    def _update_references_in_products_json(self, old_id, new_id):
+        """Update all references to a product ID in Products.json."""
+        self._rewrite_references({old_id: new_id})
+        self._save_products_json()
+    
+    def _rewrite_references(self, id_map):
+        """Replace every product ID in id_map with its new ID in Products.json."""
+        with tracer.span("reference_update", ids=len(id_map)) as span:
+            patched = None
+            if self._products_patcher is not None and self.serializer.style == "preserve":
+                patched = self._products_patcher.rename(self.reference_index, id_map)
             
-            if os.path.exists(product_file):
+            count = self.reference_index.rename(id_map)
+            self.price_index.rename(id_map)
+            if self.recipe_graph is not None:
+                self.recipe_graph.rename(id_map)
+            if patched != count:
+                # The patch doesn't cover this rename, re-serialize the file
+                self._products_patcher = None
+            span.args.update(references=count, patched=self._products_patcher is not None)
+        return count
+    
+    def _save_products_json(self):
+        """Write the in-memory Products.json back to disk."""
+        self._commit_files({self._get_products_path(): self._serialize_products_json()})
+    
+    def _get_products_path(self):
+        """Get the path of Products.json in the current save."""
+        return os.path.join(self.save_path, "Products.json")
+    
+    def _stat_products_json(self):
+        """Get (path, mtime, size) of Products.json, to tell whether it changed."""
+        products_path = self._get_products_path()
+        stat = os.stat(products_path)
+        return products_path, stat.st_mtime_ns, stat.st_size
+    
+    def _reset_products_patcher(self):
+        """Patch later renames into Products.json as written; returns its size."""
+        with open(self._get_products_path(), 'rb') as f:
+            raw = f.read()
+        self._products_patcher = ProductsJsonPatcher(raw)
+        self._products_size = len(raw)
+        self._products_stat = self._stat_products_json()
+        return len(raw)
+    
+    def _serialize_products_json(self):
+        """Serialize the in-memory Products.json (patched bytes when possible, else text)."""
+        with tracer.span("serialize_products_json") as span:
+            if self._products_patcher is not None:
+                content = self._products_patcher.render()
+            else:
+                content = self.serializer.dumps(self.products_data, self._products_indent)
+            span.add(bytes=len(content))
+        return content
+    
+    def _read_json_file(self, path):
+        """Read a save file, returning (data, indent) so it can be written back alike."""
+        with open(path, 'rb') as f:
+            return self._parse_json(f.read())
+    
+    def _parse_json(self, raw):
+        """Parse the bytes of a save file, returning (data, indent)."""
+        return self.serializer.loads(raw), detect_json_indent(raw[:4096].decode("utf-8", "replace"))
+    
+    def _get_journal_path(self):
+        """Get the path of the commit journal in the current save."""
+        return os.path.join(self.save_path, JOURNAL_FILE)
+    
+    def _commit_files(self, writes, deletes=(), appends=None):
+        """Write and delete a set of files in the save folder as one unit.
+        
+        writes maps file paths to their new content, text or bytes (written
+        as is), and appends maps file paths to text added at their end.
+        Every write and append is staged to a temporary file first, then the
+        intent is recorded in a journal and the staged files are published
+        with atomic renames (appends are copied onto the file from the
+        length it had, so they can be repeated). If the process dies part
+        way, recover_pending_commit() finishes the commit (journal
+        committed) or throws the staged files away (journal still staging)
+        the next time the save is loaded.
+        """
+        appends = appends or {}
+        targets = set(writes)
+        journal = {
+            "state": "staging",
+            "writes": [os.path.relpath(path, self.save_path) for path in writes],
+            # A file that is also rewritten (e.g. swapped IDs) must not be deleted
+            "deletes": [os.path.relpath(path, self.save_path) for path in deletes
+                        if path not in targets],
+            "appends": [[os.path.relpath(path, self.save_path),
+                         os.path.getsize(path) if os.path.exists(path) else 0] for path in appends],
+        }
+        
+        with tracer.span("commit_files", deletes=len(journal["deletes"])) as span:
+            self._write_journal(journal)
+            
+            try:
+                for path, content in list(writes.items()) + list(appends.items()):
+                    with open(path + STAGED_SUFFIX, 'wb' if isinstance(content, bytes) else 'w') as f:
+                        f.write(content)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    span.add(files=1, bytes=len(content))
+            except Exception:
+                self._roll_back_journal(journal)
+                raise
+            
+            # From here on the commit is durable and will be completed on recovery
+            journal["state"] = "committed"
+            self._write_journal(journal)
+            self._roll_forward_journal(journal)
+    
+    def _write_journal(self, journal):
+        """Atomically replace the journal file."""
+        journal_path = self._get_journal_path()
+        with open(journal_path + STAGED_SUFFIX, 'w') as f:
+            json.dump(journal, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(journal_path + STAGED_SUFFIX, journal_path)
+    
+    def _roll_forward_journal(self, journal):
+        """Publish every staged file of a committed journal, then retire it."""
+        for relative_path in journal["writes"]:
+            path = os.path.join(self.save_path, relative_path)
+            # A missing staged file was already published before a crash
+            if os.path.exists(path + STAGED_SUFFIX):
+                os.replace(path + STAGED_SUFFIX, path)
+            self._invalidate_product_file(path)
+        
+        for relative_path in journal["deletes"]:
+            path = os.path.join(self.save_path, relative_path)
+            if os.path.exists(path):
+                os.remove(path)
+            self._invalidate_product_file(path)
+        
+        for relative_path, length in journal.get("appends", []):
+            path = os.path.join(self.save_path, relative_path)
+            if os.path.exists(path + STAGED_SUFFIX):
+                with open(path + STAGED_SUFFIX, 'rb') as f:
+                    content = f.read()
+                with open(path, 'ab') as f:
+                    # Drop whatever an interrupted earlier attempt appended
+                    if f.tell() > length:
+                        f.truncate(length)
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.remove(path + STAGED_SUFFIX)
+        
+        os.remove(self._get_journal_path())
+    
+    def _roll_back_journal(self, journal):
+        """Discard the staged files of an unfinished journal, then retire it."""
+        relative_paths = journal["writes"] + [relative_path for relative_path, _ in journal.get("appends", [])]
+        for relative_path in relative_paths:
+            staged_path = os.path.join(self.save_path, relative_path) + STAGED_SUFFIX
+            if os.path.exists(staged_path):
+                os.remove(staged_path)
+        
+        os.remove(self._get_journal_path())
+    
+    def recover_pending_commit(self):
+        """Finish or undo a commit interrupted by a crash.
+        
+        Returns "rolled_forward", "rolled_back" or None if there was nothing
+        to recover.
+        """
+        if not self.save_path:
+            return None
+            
+        journal_path = self._get_journal_path()
+        if not os.path.exists(journal_path):
+            return None
+        
+        try:
+            with open(journal_path, 'r') as f:
+                journal = json.load(f)
+        except Exception:
+            # The journal is replaced atomically, so this is not one of ours
+            return None
+        
+        if journal.get("state") == "committed":
+            self._roll_forward_journal(journal)
+            return "rolled_forward"
+        
+        self._roll_back_journal(journal)
+        return "rolled_back"
+    
+    def change_product_ids(self, renames, progress=None):
+        """Change the ID (and optionally the name) of many products at once.
+        
+        renames is a list of (old_id, new_id, new_name) tuples, applied as if
+        one after another, so swaps and chains within a batch are allowed.
+        Every product file is rewritten once and Products.json is written a
+        single time. Returns one result dict per entry with "old_id",
+        "new_id", "success" and "error" keys.
+        
+        progress, if given, is called as progress(files_read, total) and may
+        raise OperationCancelled; nothing is written in that case.
+        """
+        return self.apply_plan(self.plan_renames(renames, progress), progress)
+    
+    def plan_renames(self, renames, progress=None):
+        """Work out a batch rename without writing anything; see change_product_ids().
+        
+        Affected product files are read and their new content prepared, so
+        apply_plan() only has to write. Entries with new_id equal to old_id
+        just change the display name.
+        """
+        plan = RenamePlan(renames)
+        results = plan.results
+        
+        if not self.products_data:
+            if not self.load_products_data():
+                for result in results:
+                    result["error"] = "Could not load Products.json"
+                return plan
+        plan.generation = self._generation
+        plan.backup_needed = not self.backup_made
+        
+        created_products_dir = os.path.join(self.save_path, "CreatedProducts")
+        
+        with tracer.span("rename_plan", entries=len(plan.renames)) as span:
+            # Replay the batch against a set of IDs, folding chains (a->b, b->c)
+            # into a single change per original product
+            taken = set(self.products_data["DiscoveredProducts"])
+            # Product files outside DiscoveredProducts must not be overwritten either
+            unlisted = self.get_id_allocator().existing.difference(taken)
+            changes = {}   # original id -> [new_id, new_name, result indexes]
+            origin = {}    # id created in this batch -> original id
+            
+            for index, item in enumerate(plan.renames):
+                old_id, new_id = item[0], item[1]
+                new_name = item[2] if len(item) > 2 else None
+                result = results[index]
+                
+                if old_id not in taken:
+                    result["error"] = f"Product '{old_id}' not found"
+                    continue
+                if new_id != old_id and (new_id in taken or new_id in unlisted):
+                    result["error"] = f"Product ID '{new_id}' already exists"
+                    continue
+                
+                original_id = origin.pop(old_id, old_id)
+                if original_id not in changes:
+                    if not os.path.exists(os.path.join(created_products_dir, f"{original_id}.json")):
+                        result["error"] = f"No product file for '{old_id}'"
+                        continue
+                    changes[original_id] = [original_id, None, []]
+                
+                change = changes[original_id]
+                change[0] = new_id
+                if new_name:
+                    change[1] = new_name
+                change[2].append(index)
+                
+                taken.discard(old_id)
+                taken.add(new_id)
+                origin[new_id] = original_id
+            
+            # Read every affected product file and prepare its new content
+            contents = {}
+            dropped = []
+            total = len(changes)
+            for done, (original_id, (new_id, new_name, indexes)) in enumerate(list(changes.items())):
+                if progress and done % PROGRESS_INTERVAL == 0:
+                    progress(done, total)
                 try:
-                    with open(product_file, 'r') as f:
-                        product_data = json.load(f)
-                    name = product_data["Name"]
-                    product_type = product_data.get("DataType", "Unknown")
-                    properties = product_data.get("Properties", [])
-                except:
-                    pass
-                    
-            details.append({
-                "id": product_id,
-                "name": name,
-                "type": product_type,
-                "properties": properties
-            })
+                    product_data, indent = self._read_json_file(
+                        os.path.join(created_products_dir, f"{original_id}.json"))
+                    plan.old_names[original_id] = product_data.get("Name")
+                    product_data["ID"] = new_id
+                    if new_name:
+                        product_data["Name"] = new_name
+                except Exception as e:
+                    for index in indexes:
+                        results[index]["error"] = f"Could not read product file: {e}"
+                    del changes[original_id]
+                    dropped.append(original_id)
+                    continue
+                contents[original_id] = self.serializer.dumps(product_data, indent)
+            
+            # A product whose change was dropped keeps its ID, so a change moving
+            # another product onto that ID (a chain or swap) must be dropped too
+            if dropped:
+                self._drop_blocked_changes(changes, results, dropped)
+            
+            for original_id, (new_id, _, _) in changes.items():
+                plan.writes[os.path.join(created_products_dir, f"{new_id}.json")] = contents[original_id]
+                if new_id != original_id:
+                    plan.deletes.append(os.path.join(created_products_dir, f"{original_id}.json"))
+                    plan.id_map[original_id] = new_id
+            
+            plan.changes = {original_id: tuple(change) for original_id, change in changes.items()}
             
-        return sorted(details, key=lambda x: x["id"])
+            # References per section and the size Products.json will have
+            size_change = 0
+            for section in ProductReferenceIndex.LIST_SECTIONS:
+                plan.references[section] = 0
+            for section, _ in ProductReferenceIndex.RECORD_SECTIONS:
+                plan.references[section] = 0
+            for original_id, new_id in plan.id_map.items():
+                locations = self.reference_index.locations.get(original_id, ())
+                for section, _, _ in locations:
+                    plan.references[section] += 1
+                size_change += len(locations) * (len(json.dumps(new_id)) - len(json.dumps(original_id)))
+            if plan.id_map:
+                plan.products_json_bytes = self._products_size + size_change
+            
+            span.add(files=plan.files_to_write, bytes=plan.bytes_to_write)
+        
+        return plan
     
-    def rename_product(self, old_id, new_name):
-        """Rename a product's display name but keep the same ID."""
-        if not self.products_data:
-            if not self.load_products_data():
-                return False
+    def _drop_blocked_changes(self, changes, results, dropped):
+        """Drop every change moving a product onto an ID that a dropped change leaves in use."""
+        holders = {new_id: original_id for original_id, (new_id, _, _) in changes.items()}
+        blocked = list(dropped)
+        while blocked:
+            product_id = blocked.pop()
+            original_id = holders.pop(product_id, None)
+            if original_id is None:
+                continue
+            for index in changes.pop(original_id)[2]:
+                results[index]["error"] = f"Another rename in this chain failed, '{product_id}' is still in use"
+            # That product keeps its ID as well
+            blocked.append(original_id)
+    
+    def apply_plan(self, plan, progress=None):
+        """Carry out a RenamePlan from plan_renames() and return its results.
+        
+        The plan is refused if Products.json was reloaded or written since
+        it was made. Reserved IDs that were not applied are given back.
+        """
+        with tracer.span("rename_batch", entries=len(plan.renames)):
+            self._apply_plan(plan, progress)
+        
+        # Reservations of applied IDs became real, the rest are given back
+        self.release_product_ids(result["new_id"] for result in plan.results)
+        return plan.results
+    
+    def _apply_plan(self, plan, progress):
+        """The body of apply_plan()."""
+        results = plan.results
+        if not plan.changes:
+            return
+        
+        if not self.products_data or plan.generation != self._generation:
+            for _, _, indexes in plan.changes.values():
+                for index in indexes:
+                    results[index]["error"] = "The save changed after the rename was planned"
+            return
         
-        # Make sure we have a backup
         if not self.backup_made:
-            if not self.make_backup():
-                return False
+            if not self.make_backup(progress):
+                for _, _, indexes in plan.changes.values():
+                    for index in indexes:
+                        results[index]["error"] = "Could not create a backup"
+                return
         
-        # Find the product file in CreatedProducts folder
-        product_file = os.path.join(self.save_path, "CreatedProducts", f"{old_id}.json")
-        if not os.path.exists(product_file):
-            return False
+        # The undo entry needs the references as they are before the rewrite
+        entry = self._history_entry(plan)
+        history = self.get_history().after(plan.history_action, entry)
+        
+        writes = dict(plan.writes)
+        if plan.id_map:
+            self._rewrite_references(plan.id_map)
+            writes[self._get_products_path()] = self._serialize_products_json()
+        appends = {self._get_history_path(): RenameHistory.log_line(plan.history_action, entry)}
         
-        # Update the product name in its individual file
         try:
-            with open(product_file, 'r') as f:
-                product_data = json.load(f)
-            
-            # Update the name
-            product_data["Name"] = new_name
-            
-            with open(product_file, 'w') as f:
-                json.dump(product_data, f, indent=4)
-            
-            return True
-        except Exception:
-            return False
-    
-    def change_product_id(self, old_id, new_id, new_name=None):
-        """Change a product's ID and optionally its name."""
-        if not self.products_data:
-            if not self.load_products_data():
-                return False
+            self._commit_files(writes, plan.deletes, appends)
+        except Exception as e:
+            self._forget_products_data()
+            for _, _, indexes in plan.changes.values():
+                for index in indexes:
+                    results[index]["error"] = str(e)
+            return
         
-        # Make sure we have a backup
-        if not self.backup_made:
-            if not self.make_backup():
-                return False
+        if plan.id_map:
+            try:
+                if self._products_patcher is None:
+                    # Re-serialized, later renames can patch the file as written
+                    self._reset_products_patcher()
+                else:
+                    self._products_size = len(writes[self._get_products_path()])
+                    self._products_stat = self._stat_products_json()
+            except OSError:
+                # Parse the file again on the next load
+                self._products_stat = None
+        self._generation += 1
+        self.history = history
+        if history.lines > HISTORY_COMPACT_LINES:
+            self._compact_history()
         
-        # Check if the old ID exists and new ID doesn't already exist
-        if old_id not in self.products_data["DiscoveredProducts"]:
-            return False
+        if self.check_after_commit:
+            self.last_integrity_report = self.check_integrity()
         
-        if new_id in self.products_data["DiscoveredProducts"]:
-            return False
+        for original_id, (new_id, _, indexes) in plan.changes.items():
+            self.get_id_allocator().commit(original_id, new_id)
+            for index in indexes:
+                results[index]["success"] = True
+    
+    def _history_entry(self, plan):
+        """Describe an applied plan as a reversible history entry."""
+        if plan.history_action != "record":
+            # Undo and redo move the existing entry between the stacks
+            return plan.history_entry
         
-        # Find the product file in CreatedProducts folder
-        old_product_file = os.path.join(self.save_path, "CreatedProducts", f"{old_id}.json")
-        if not os.path.exists(old_product_file):
-            return False
+        changes = []
+        for original_id, (new_id, new_name, _) in plan.changes.items():
+            old_name = plan.old_names.get(original_id)
+            locations = {}
+            if new_id != original_id:
+                locations = RenameHistory.pack_locations(self.reference_index.locations.get(original_id, ()))
+            changes.append({"old_id": original_id, "new_id": new_id, "old_name": old_name,
+                            "new_name": new_name or old_name, "locations": locations})
         
-        # Update the product ID in its individual file
+        if len(changes) == 1:
+            label = f"Rename {changes[0]['old_id']} to {changes[0]['new_name'] or changes[0]['new_id']}"
+        else:
+            label = f"Rename {len(changes)} products"
+        return {"time": datetime.now().isoformat(timespec="seconds"), "label": label, "changes": changes}
+    
+    def get_history(self):
+        """Get the undo history of this save."""
+        if self.history is None:
+            self.history = RenameHistory.load(self._get_history_path())
+        return self.history
+    
+    def _get_history_path(self):
+        """Get the path of the undo history log in the current save."""
+        return os.path.join(self.save_path, HISTORY_FILE)
+    
+    def _compact_history(self):
+        """Rewrite a long history log as a single line, dropping renames past the limit."""
         try:
-            with open(old_product_file, 'r') as f:
-                product_data = json.load(f)
-            
-            # Update the ID and optionally the name
-            product_data["ID"] = new_id
-            if new_name:
-                product_data["Name"] = new_name
-            
-            # Save to new file
-            new_product_file = os.path.join(self.save_path, "CreatedProducts", f"{new_id}.json")
-            with open(new_product_file, 'w') as f:
-                json.dump(product_data, f, indent=4)
-            
-            # Remove the old file
-            os.remove(old_product_file)
-            
-            # Update all references in Products.json
-            self._update_references_in_products_json(old_id, new_id)
-            
-            return True
+            self._commit_files({self._get_history_path(): self.history.dumps()})
+            self.history.lines = 1
         except Exception:
-            return False
+            # The long log still replays to the same history
+            pass
     
-    def _update_references_in_products_json(self, old_id, new_id):
-        """Update all references to a product ID in Products.json."""
-        # Update discovered products list
-        for i, product in enumerate(self.products_data["DiscoveredProducts"]):
-            if product == old_id:
-                self.products_data["DiscoveredProducts"][i] = new_id
-        
-        # Update mix recipes
-        for recipe in self.products_data["MixRecipes"]:
-            if recipe["Product"] == old_id:
-                recipe["Product"] = new_id
-            if recipe["Mixer"] == old_id:
-                recipe["Mixer"] = new_id
-            if recipe["Output"] == old_id:
-                recipe["Output"] = new_id
-        
-        # Update product prices
-        for price_entry in self.products_data["ProductPrices"]:
-            if price_entry["String"] == old_id:
-                price_entry["String"] = new_id
-        
-        # Update favorited products
-        for i, product in enumerate(self.products_data["FavouritedProducts"]):
-            if product == old_id:
-                self.products_data["FavouritedProducts"][i] = new_id
-        
-        # Save the updated Products.json
-        products_path = os.path.join(self.save_path, "Products.json")
-        with open(products_path, 'w') as f:
-            json.dump(self.products_data, f, indent=4)
+    def undo(self, progress=None, force=False):
+        """Undo the last rename, see replay_history()."""
+        return self.replay_history("undo", progress, force)
+    
+    def redo(self, progress=None, force=False):
+        """Redo the last undone rename, see replay_history()."""
+        return self.replay_history("redo", progress, force)
     
-    def bulk_rename_from_list(self, rename_list):
-        """Rename multiple products from a list of tuples."""
+    def replay_history(self, action, progress=None, force=False):
+        """Reverse ("undo") or repeat ("redo") the latest history entry.
+        
+        Only the products and references of that entry are touched. The
+        step is refused as a whole if any product or reference it recorded
+        has changed since (unless force is set, which skips the reference
+        check). Returns (entry, results) with one result per change, or
+        (None, []) when there is nothing to undo or redo.
+        """
         if not self.products_data:
             if not self.load_products_data():
-                return False
-                
-        if not self.backup_made:
-            if not self.make_backup():
-                return False
-                
-        success_count = 0
-        error_count = 0
+                return None, []
+        
+        history = self.get_history()
+        stack = history.undo if action == "undo" else history.redo
+        if not stack:
+            return None, []
+        entry = stack[-1]
+        
+        # Undo goes from new to old, redo from old to new
+        if action == "undo":
+            steps = [(change["new_id"], change["old_id"], change["old_name"], change)
+                     for change in entry["changes"]]
+        else:
+            steps = [(change["old_id"], change["new_id"], change["new_name"], change)
+                     for change in entry["changes"]]
+        
+        results = [{"old_id": from_id, "new_id": to_id, "success": False, "error": None}
+                   for from_id, to_id, _, _ in steps]
+        for result, (from_id, to_id, _, change) in zip(results, steps):
+            if not force and from_id != to_id:
+                current = set(self.reference_index.locations.get(from_id, ()))
+                if any(location not in current for location in RenameHistory.unpack_locations(change["locations"])):
+                    result["error"] = f"References to '{from_id}' changed since the rename"
+        if any(result["error"] for result in results):
+            return entry, results
         
+        # Move every ID out of the way first so swaps and chains reverse cleanly;
+        # the planner folds each pair of moves into one change
+        renames = []
+        indexes = []
+        for from_id, to_id, name, _ in steps:
+            if from_id != to_id:
+                indexes.append([len(renames)])
+                renames.append((from_id, f"{from_id}~{action}", None))
+            else:
+                indexes.append([])
+        for step_indexes, (from_id, to_id, name, _) in zip(indexes, steps):
+            step_indexes.append(len(renames))
+            renames.append((f"{from_id}~{action}" if from_id != to_id else from_id, to_id, name))
+        
+        plan = self.plan_renames(renames, progress)
+        if plan.error_count:
+            # All or nothing, a partial undo would leave the history out of step
+            for result, step_indexes in zip(results, indexes):
+                errors = [plan.results[index]["error"] for index in step_indexes if plan.results[index]["error"]]
+                result["error"] = errors[0] if errors else "Another change in this step failed"
+            self.discard_plan(plan)
+            return entry, results
+        
+        plan.history_action = action
+        plan.history_entry = entry
+        self.apply_plan(plan, progress)
+        for result, step_indexes in zip(results, indexes):
+            result["success"] = plan.results[step_indexes[-1]]["success"]
+            result["error"] = plan.results[step_indexes[-1]]["error"]
+        return entry, results
+    
+    def plan_bulk_rename(self, rename_list, progress=None):
+        """Plan a bulk rename without writing anything; see bulk_rename_from_list()."""
+        renames = []
         for rename_item in rename_list:
             if len(rename_item) < 2:
                 continue
-                
-            old_id = rename_item[0]
             
             # If there are 3 parts, we're changing the ID and name
             if len(rename_item) >= 3:
-                new_id = rename_item[1]
-                new_name = rename_item[2]
-                if self.change_product_id(old_id, new_id, new_name):
-                    success_count += 1
-                else:
-                    error_count += 1
+                renames.append(tuple(rename_item[:3]))
             # If there are 2 parts, we're just changing the name
             else:
-                new_name = rename_item[1]
-                if self.rename_product(old_id, new_name):
-                    success_count += 1
-                else:
-                    error_count += 1
+                renames.append((rename_item[0], rename_item[0], rename_item[1]))
+        
+        return self.plan_renames(renames, progress)
+    
+    def bulk_rename_from_list(self, rename_list, progress=None, plan=None):
+        """Rename multiple products from a list of tuples.
+        
+        Entries with 3 parts (old_id, new_id, new_name) change the ID and
+        name; entries with 2 parts (old_id, new_name) only change the display
+        name. All of them go through the batch engine in change_product_ids().
+        A plan from plan_bulk_rename() for the same list is applied as is.
+        The per-entry results are kept in self.last_bulk_results.
+        """
+        if plan is None:
+            plan = self.plan_bulk_rename(rename_list, progress)
+        if not plan.renames:
+            self.last_bulk_results = []
+            return 0, 0
+        if plan.generation is None:
+            return False
+        
+        results = self.apply_plan(plan, progress)
+        
+        self.last_bulk_results = results
+        success_count = sum(1 for result in results if result["success"])
+        return success_count, len(results) - success_count
+    
+    def discard_plan(self, plan):
+        """Give back the IDs reserved for a plan that won't be applied."""
+        self.release_product_ids(new_id for _, new_id, *_ in plan.renames)
+    
+    def build_rename_list(self, entries):
+        """Turn (old_id, new_name) pairs into (old_id, new_id, new_name) renames.
+        
+        New IDs are generated from the names and made unique against the
+        save and the rest of the batch. Returns (rename_list, skipped) where
+        skipped holds (old_id, new_name, reason) for unusable entries.
+        """
+        rename_list = []
+        skipped = []
+        
+        for old_id, new_name in entries:
+            new_id = self.allocate_product_id(old_id, new_name)
+            if new_id is None:
+                # Skip entries that would generate invalid IDs
+                skipped.append((old_id, new_name, f"new name '{new_name}' would generate an invalid ID"))
+                continue
+            
+            # Add to rename list with auto-generated ID
+            rename_list.append((old_id, new_id, new_name))
+        
+        return rename_list, skipped
+    
+    def get_id_allocator(self):
+        """Get the allocator for new product IDs in this save."""
+        if self.id_allocator is None:
+            existing = set(self.get_product_list())
+            
+            # Product files nobody lists still occupy their ID
+            try:
+                with os.scandir(os.path.join(self.save_path, "CreatedProducts")) as entries:
+                    existing.update(entry.name[:-len(".json")] for entry in entries
+                                    if entry.name.endswith(".json"))
+            except OSError:
+                pass
+            self.id_allocator = ProductIdAllocator(existing)
+        
+        return self.id_allocator
+    
+    def allocate_product_id(self, old_id, new_name):
+        """Reserve a unique ID generated from a new name; None if the name has no usable characters.
+        
+        The ID stays reserved until the rename is applied by
+        change_product_ids() or given back with release_product_ids().
+        """
+        new_id = name_to_id(new_name)
+        if not new_id:
+            return None
+        
+        return self.get_id_allocator().allocate(new_id, old_id)
+    
+    def release_product_ids(self, product_ids):
+        """Give back IDs reserved for renames that won't be applied."""
+        if self.id_allocator is not None:
+            for product_id in product_ids:
+                self.id_allocator.release(product_id)
+    
+    def validate_rename_rows(self, chunks, report, progress=None):
+        """Validate streamed (line, old_id, new_name) chunks against the save.
+        
+        Problems go to report instead of stopping the import. Returns
+        (rename_list, lines): the renames ready for change_product_ids() and
+        the source line of each, for report.add_results().
+        """
+        rename_list = []
+        lines = []
+        if not self.products_data:
+            if not self.load_products_data():
+                return rename_list, lines
+        
+        try:
+            for chunk in chunks:
+                for line, old_id, new_name in chunk:
+                    if not self.reference_index.is_discovered(old_id):
+                        report.add_error(line, old_id, "product not found")
+                        continue
+                    
+                    new_id = self.allocate_product_id(old_id, new_name)
+                    if new_id is None:
+                        report.add_error(line, old_id, f"new name '{new_name}' would generate an invalid ID")
+                        continue
+                    
+                    rename_list.append((old_id, new_id, new_name))
+                    lines.append(line)
+                
+                if progress:
+                    progress(report.rows, None)
+        except OperationCancelled:
+            self.release_product_ids(new_id for _, new_id, _ in rename_list)
+            raise
         
-        return success_count, error_count
+        return rename_list, lines
 
-def find_save_folders():
-    """Find all Schedule 1 save folders on the system."""
-    saves = []
+# Extra folders to search for saves, separated by os.pathsep
+SAVE_ROOTS_ENV = "SCHEDULE1_SAVE_ROOTS"
+
+def get_default_save_root():
+    """Get the game's Saves folder for this platform."""
     system = platform.system()
     
     if system == "Windows":
@@ -260,84 +2491,575 @@ def find_save_folders():
         ctypes.windll.shell32.SHGetFolderPathW(None, CSIDL_PROFILE, None, 0, buf)
         user_profile = buf.value
         
-        base_path = os.path.join(user_profile, "AppData", "LocalLow", "TVGS", "Schedule I", "Saves")
+        return os.path.join(user_profile, "AppData", "LocalLow", "TVGS", "Schedule I", "Saves")
+    elif system == "Darwin":
+        return os.path.expanduser("~/Library/Application Support/TVGS/Schedule I/Saves")
+    else:
+        return os.path.expanduser("~/.config/unity3d/TVGS/Schedule I/Saves")
+
+class SaveFolderScanner:
+    """Finds save folders with one os.scandir per directory.
+    
+    Every directory listing is cached with the directory's modification
+    time, which changes whenever an entry is added, removed or renamed, so
+    repeated scans only re-list directories that actually changed.
+    """
+    
+    def __init__(self):
+        # path -> (mtime_ns, subdirectory names, file names)
+        self._listings = {}
+    
+    def _list(self, path):
+        """Get (subdirectory names, file names) of a directory, or None if it is missing."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._listings.pop(path, None)
+            return None
+        
+        cached = self._listings.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+        
+        dirs = []
+        files = set()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            dirs.append(entry.name)
+                        else:
+                            files.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
         
-        if os.path.exists(base_path):
+        dirs.sort()
+        self._listings[path] = (mtime, dirs, files)
+        return dirs, files
+    
+    def find(self, roots):
+        """Find save folders under each Saves root, as (display name, path) tuples."""
+        saves = []
+        for base_path in roots:
+            listing = self._list(base_path)
+            if listing is None:
+                continue
+            steam_id_folders, base_files = listing
+            
+            # A root may also point straight at a save folder
+            if "Products.json" in base_files:
+                saves.append((f"Custom: {os.path.basename(os.path.normpath(base_path))}", base_path))
+            
             # Look for Steam ID folders
-            steam_id_folders = [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
             for steam_id in steam_id_folders:
                 steam_folder = os.path.join(base_path, steam_id)
+                listing = self._list(steam_folder)
+                if listing is None:
+                    continue
                 
-                # Check for "save" folder (original path structure)
-                save_folder = os.path.join(steam_folder, "save")
-                if os.path.exists(save_folder) and os.path.exists(os.path.join(save_folder, "Products.json")):
-                    saves.append((f"Steam ID: {steam_id} (save)", save_folder))
+                # "save" is the original path structure, "SaveGame_X" the new one
+                folder_names = [name for name in listing[0] if name.startswith("SaveGame_")]
+                if "save" in listing[0]:
+                    folder_names.insert(0, "save")
                 
-                # Check for "SaveGame_X" folders (new path structure)
-                save_game_folders = [f for f in os.listdir(steam_folder) 
-                                   if os.path.isdir(os.path.join(steam_folder, f)) and f.startswith("SaveGame_")]
-                for save_game in save_game_folders:
-                    save_game_folder = os.path.join(steam_folder, save_game)
+                for folder_name in folder_names:                    
+                    save_game_folder = os.path.join(steam_folder, folder_name)
+                    save_listing = self._list(save_game_folder)
+                    if save_listing is None:
+                        continue
+                    save_dirs, save_files = save_listing
+                    
                     # Check if Products.json or Products folder exists
-                    if os.path.exists(os.path.join(save_game_folder, "Products.json")):
-                        saves.append((f"Steam ID: {steam_id} ({save_game})", save_game_folder))
-                    elif os.path.exists(os.path.join(save_game_folder, "Products")):
+                    if "Products.json" in save_files:
+                        saves.append((f"Steam ID: {steam_id} ({folder_name})", save_game_folder))
+                    elif folder_name != "save" and "Products" in save_dirs:
                         products_folder = os.path.join(save_game_folder, "Products")
-                        if os.path.exists(os.path.join(products_folder, "Products.json")):
-                            saves.append((f"Steam ID: {steam_id} ({save_game}/Products)", products_folder))
+                        products_listing = self._list(products_folder)
+                        if products_listing is not None and "Products.json" in products_listing[1]:
+                            saves.append((f"Steam ID: {steam_id} ({folder_name}/Products)", products_folder))
+        
+        return saves
 
-    elif system == "Darwin":
-        # Similar changes for macOS
-        base_path = os.path.expanduser("~/Library/Application Support/TVGS/Schedule I/Saves")
-        if os.path.exists(base_path):
-            # Same pattern as Windows code
-            steam_id_folders = [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
-            for steam_id in steam_id_folders:
-                steam_folder = os.path.join(base_path, steam_id)
-                
-                # Check for "save" folder
-                save_folder = os.path.join(steam_folder, "save")
-                if os.path.exists(save_folder) and os.path.exists(os.path.join(save_folder, "Products.json")):
-                    saves.append((f"Steam ID: {steam_id} (save)", save_folder))
-                
-                # Check for "SaveGame_X" folders
-                save_game_folders = [f for f in os.listdir(steam_folder) 
-                                   if os.path.isdir(os.path.join(steam_folder, f)) and f.startswith("SaveGame_")]
-                for save_game in save_game_folders:
-                    save_game_folder = os.path.join(steam_folder, save_game)
-                    if os.path.exists(os.path.join(save_game_folder, "Products.json")):
-                        saves.append((f"Steam ID: {steam_id} ({save_game})", save_game_folder))
-                    elif os.path.exists(os.path.join(save_game_folder, "Products")):
-                        products_folder = os.path.join(save_game_folder, "Products")
-                        if os.path.exists(os.path.join(products_folder, "Products.json")):
-                            saves.append((f"Steam ID: {steam_id} ({save_game}/Products)", products_folder))
-    else:
-        # Linux path with similar changes
-        base_path = os.path.expanduser("~/.config/unity3d/TVGS/Schedule I/Saves")
-        if os.path.exists(base_path):
-            # Same pattern as Windows code
-            steam_id_folders = [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
-            for steam_id in steam_id_folders:
-                steam_folder = os.path.join(base_path, steam_id)
-                
-                # Check for "save" folder
-                save_folder = os.path.join(steam_folder, "save")
-                if os.path.exists(save_folder) and os.path.exists(os.path.join(save_folder, "Products.json")):
-                    saves.append((f"Steam ID: {steam_id} (save)", save_folder))
-                
-                # Check for "SaveGame_X" folders
-                save_game_folders = [f for f in os.listdir(steam_folder) 
-                                   if os.path.isdir(os.path.join(steam_folder, f)) and f.startswith("SaveGame_")]
-                for save_game in save_game_folders:
-                    save_game_folder = os.path.join(steam_folder, save_game)
-                    if os.path.exists(os.path.join(save_game_folder, "Products.json")):
-                        saves.append((f"Steam ID: {steam_id} ({save_game})", save_game_folder))
-                    elif os.path.exists(os.path.join(save_game_folder, "Products")):
-                        products_folder = os.path.join(save_game_folder, "Products")
-                        if os.path.exists(os.path.join(products_folder, "Products.json")):
-                            saves.append((f"Steam ID: {steam_id} ({save_game}/Products)", products_folder))
+# Shared so repeated detection reuses the cached directory listings
+_save_scanner = SaveFolderScanner()
+
+def find_save_folders(extra_roots=None):
+    """Find all Schedule 1 save folders on the system.
+    
+    Searches the game's default Saves folder, the folders listed in the
+    SCHEDULE1_SAVE_ROOTS environment variable and any extra_roots.
+    """
+    roots = [get_default_save_root()]
+    roots.extend(root for root in os.environ.get(SAVE_ROOTS_ENV, "").split(os.pathsep) if root)
+    if extra_roots:
+        roots.extend(extra_roots)
+    
+    return _save_scanner.find(roots)
+
+# Seconds between checks of a watched save folder
+WATCH_INTERVAL = 2.0
+
+class SaveWatcher:
+    """Watches a save folder for changes by polling file modification times.
+    
+    Each poll stats Products.json and the files in CreatedProducts and
+    compares them with the previous snapshot. start() polls on a daemon
+    thread and calls callback(changes) from that thread, where changes is a
+    dict with "products_json" (bool) and "changed", "added" and "removed"
+    sets of product IDs.
+    """
+    
+    def __init__(self, save_path, interval=WATCH_INTERVAL):
+        self.save_path = save_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.snapshot = self._take_snapshot()
+    
+    def _take_snapshot(self):
+        """Stat Products.json and every product file."""
+        try:
+            stat = os.stat(os.path.join(self.save_path, "Products.json"))
+            products_signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            products_signature = None
+        
+        files = {}
+        try:
+            with os.scandir(os.path.join(self.save_path, "CreatedProducts")) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files[entry.name[:-len(".json")]] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        
+        return products_signature, files
+    
+    def resync(self):
+        """Accept the current state of the folder, e.g. after our own writes."""
+        self.snapshot = self._take_snapshot()
+    
+    def forget_products_json(self):
+        """Report Products.json as changed on the next poll (e.g. it was read mid-write)."""
+        self.snapshot = (None, self.snapshot[1])
+    
+    def poll(self):
+        """Compare the folder with the last snapshot; returns the changes or None."""
+        products_signature, files = self._take_snapshot()
+        old_products_signature, old_files = self.snapshot
+        self.snapshot = (products_signature, files)
+        
+        changes = {
+            "products_json": products_signature != old_products_signature,
+            "added": files.keys() - old_files.keys(),
+            "removed": old_files.keys() - files.keys(),
+            "changed": {product_id for product_id, signature in files.items()
+                        if product_id in old_files and old_files[product_id] != signature},
+        }
+        if changes["products_json"] or changes["added"] or changes["removed"] or changes["changed"]:
+            return changes
+        return None
+    
+    def start(self, callback):
+        """Start polling on a background thread."""
+        self._stop.clear()
+        
+        def run():
+            while not self._stop.wait(self.interval):
+                changes = self.poll()
+                if changes and not self._stop.is_set():
+                    callback(changes)
+        
+        self._thread = threading.Thread(target=run, name="SaveWatcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop polling."""
+        self._stop.set()
+
+def apply_renames_to_save(save_path, source, backup=True, backup_mode="copy", backup_keep=10,
+                          json_style="preserve", dry_run=False):
+    """Apply an original_id,new_name rename list to one save.
+    
+    This is the work of one multi-save worker process. source is the path
+    of a rename file or a list of (line_number, old_id, new_name) rows.
+    Products the save doesn't have are counted as missing, not as errors.
+    Returns a dict with the counts, the problems, the backup made and, if
+    the save could not be processed at all, an error message.
+    """
+    result = {"path": save_path, "rows": 0, "success": 0, "missing": 0, "errors": 0,
+              "problems": [], "backup": None, "error": None}
+    try:
+        tool = Schedule1ModTool(save_path, backup_mode=backup_mode, backup_keep=backup_keep,
+                                json_style=json_style)
+        if not backup:
+            tool.backup_made = True
+        if not tool.load_products_data():
+            result["error"] = "Could not load Products.json"
+            return result
+        
+        report = RenameImportReport()
+        if isinstance(source, str):
+            chunks = read_rename_file(source, report)
+        else:
+            chunks = [source]
+            report.rows = len(source)
+        
+        def present(chunks):
+            # Saves share the rename list but not necessarily the products
+            for chunk in chunks:
+                kept = [row for row in chunk if tool.reference_index.is_discovered(row[1])]
+                result["missing"] += len(chunk) - len(kept)
+                yield kept
+        
+        rename_list, lines = tool.validate_rename_rows(present(chunks), report)
+        plan = tool.plan_renames(rename_list)
+        if dry_run:
+            tool.discard_plan(plan)
+            result["plan"] = plan.to_dict()
+            result["success"] = len(plan.renames) - plan.error_count
+        else:
+            results = tool.apply_plan(plan)
+            report.add_results(lines, results)
+            result["success"] = sum(1 for entry in results if entry["success"])
+            if tool.last_backup_path:
+                result["backup"] = tool.last_backup_path
+        
+        result["rows"] = report.rows
+        result["errors"] = report.error_count
+        result["problems"] = report.errors
+    except Exception as e:
+        result["error"] = str(e)
+    
+    return result
+
+class MultiSaveReport:
+    """The results of applying one rename list to several saves, see apply_renames_to_saves()."""
+    
+    def __init__(self, results):
+        self.results = results
+    
+    @property
+    def success(self):
+        return sum(result["success"] for result in self.results)
+    
+    @property
+    def missing(self):
+        return sum(result["missing"] for result in self.results)
+    
+    @property
+    def errors(self):
+        return sum(result["errors"] for result in self.results)
+    
+    @property
+    def failed_saves(self):
+        return [result for result in self.results if result["error"]]
+    
+    def summary(self, limit=5):
+        """One line per save plus the totals, with the first problems of each save."""
+        lines = []
+        for result in self.results:
+            if result["error"]:
+                lines.append(f"{result['path']}: failed - {result['error']}")
+                continue
+            renamed = "can be renamed" if "plan" in result else "renamed"
+            lines.append(f"{result['path']}: {result['success']} {renamed}, "
+                         f"{result['missing']} not in this save, {result['errors']} problem(s)")
+            for line, old_id, message in sorted(result["problems"], key=lambda problem: problem[0])[:limit]:
+                lines.append(f"  Line {line}: '{old_id}' - {message}")
+        renamed = "can be renamed" if any("plan" in result for result in self.results) else "renamed"
+        lines.append(f"Total: {self.success} {renamed} in {len(self.results) - len(self.failed_saves)} of "
+                     f"{len(self.results)} save(s), {self.errors} problem(s)")
+        return "\n".join(lines)
+    
+    def to_dict(self):
+        saves = []
+        for result in self.results:
+            result = dict(result)
+            result["problems"] = [{"line": line, "old_id": old_id, "error": message}
+                                  for line, old_id, message in result["problems"]]
+            saves.append(result)
+        return {
+            "saves": saves,
+            "success": self.success,
+            "missing": self.missing,
+            "errors": self.errors,
+            "failed_saves": len(self.failed_saves),
+        }
+
+def apply_renames_to_saves(save_paths, source, workers=None, progress=None, **options):
+    """Apply one rename list to several saves in parallel worker processes.
+    
+    Each save is handled by apply_renames_to_save() (which takes the
+    keyword options) in its own process, with its own backup. workers
+    defaults to one per CPU; with 1 the saves are done one by one in this
+    process. progress, if given, is called as progress(saves_done, total)
+    and may raise OperationCancelled: saves not started yet are skipped,
+    running ones finish. Returns a MultiSaveReport.
+    """
+    save_paths = list(save_paths)
+    total = len(save_paths)
+    results = [None] * total
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, total)
+    
+    with tracer.span("multi_save_apply", saves=total, workers=workers) as span:
+        if workers <= 1:
+            for done, save_path in enumerate(save_paths):
+                if progress:
+                    progress(done, total)
+                results[done] = apply_renames_to_save(save_path, source, **options)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(apply_renames_to_save, save_path, source, **options): index
+                           for index, save_path in enumerate(save_paths)}
+                try:
+                    for done, future in enumerate(as_completed(futures)):
+                        if progress:
+                            progress(done, total)
+                        index = futures[future]
+                        try:
+                            results[index] = future.result()
+                        except Exception as e:
+                            # The worker process itself died
+                            results[index] = {"path": save_paths[index], "rows": 0, "success": 0, "missing": 0,
+                                              "errors": 0, "problems": [], "backup": None, "error": str(e)}
+                except OperationCancelled:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        if progress:
+            progress(total, total)
+        span.add(files=total)
+    
+    return MultiSaveReport(results)
+
+# Delay after the last keystroke before the product filter is applied
+FILTER_DELAY_MS = 150
+
+# How often the Tk thread checks on a running background job
+JOB_POLL_MS = 100
+
+# Imported rename files above this size are streamed instead of shown in the text area
+IMPORT_PREVIEW_BYTES = 256 * 1024
+
+class BackgroundJob:
+    """Runs one operation on a worker thread and hands its progress and result to the Tk thread.
+    
+    The work function receives the job and should pass job.progress as the
+    progress callback of the mod tool methods it calls. Calling progress()
+    after cancel() raises OperationCancelled inside the worker. Events are
+    queued as ("progress", (done, total)), ("done", result),
+    ("error", exception) or ("cancelled", None).
+    """
+    
+    def __init__(self, name, work):
+        self.name = name
+        self.work = work
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._last_report = 0.0
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+    
+    def start(self):
+        """Start the worker thread."""
+        self.thread.start()
+    
+    def cancel(self):
+        """Ask the worker to stop at its next progress report."""
+        self.cancel_event.set()
+    
+    def progress(self, done, total=None):
+        """Progress callback for the worker; raises OperationCancelled once cancelled."""
+        if self.cancel_event.is_set():
+            raise OperationCancelled()
+        
+        # Don't flood the Tk thread, a few updates per second are plenty
+        now = time.monotonic()
+        if now - self._last_report >= 0.05 or (total and done >= total):
+            self._last_report = now
+            self.events.put(("progress", (done, total)))
     
-    return saves
+    def _run(self):
+        """Worker thread body."""
+        try:
+            with tracer.span(self.name):
+                result = self.work(self)
+        except OperationCancelled:
+            self.events.put(("cancelled", None))
+        except Exception as e:
+            self.events.put(("error", e))
+        else:
+            self.events.put(("done", result))
+
+# Recipes listed per branch of the lineage panel
+LINEAGE_CHILD_LIMIT = 200
+
+# Above this many products the list only keeps the visible rows in the Treeview
+VIRTUAL_LIST_THRESHOLD = 10000
+
+class VirtualTreeview:
+    """Drives a Treeview that only holds the rows currently on screen.
+    
+    The full list of rows lives in self.rows; scrolling just moves the
+    window and rewrites the values of the few Treeview items, so populating,
+    sorting and scrolling cost the same for any number of rows. Rows are
+    turned into values by format_row only when they come on screen.
+    """
+    
+    # Event sequences handled while the virtual mode is active
+    BINDINGS = ("<Configure>", "<MouseWheel>", "<Button-4>", "<Button-5>",
+                "<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>")
+    
+    def __init__(self, tree, scrollbar, rowheight, format_row=tuple, on_select=None):
+        """Wrap an existing Treeview and its vertical scrollbar.
+        
+        on_select is called with the <<TreeviewSelect>> event when the user
+        selects a row, in both modes; the Treeview's select binding belongs
+        to this class so switching modes never drops it.
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rowheight = rowheight
+        self.format_row = format_row
+        self.select_callback = on_select
+        self.rows = []
+        self.first = 0
+        self.selected_row = None
+        # Model row last passed to select_callback
+        self.reported_row = None
+        self.active = False
+        tree.bind("<<TreeviewSelect>>", self.on_select)
+    
+    def activate(self):
+        """Switch the Treeview into virtual mode."""
+        if self.active:
+            return
+        self.active = True
+        self.tree.delete(*self.tree.get_children())
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.configure(command=self.yview)
+        
+        handlers = (self.render, self.on_mousewheel, lambda e: self.scroll(-3), lambda e: self.scroll(3),
+                    lambda e: self.on_key(-1), lambda e: self.on_key(1),
+                    lambda e: self.on_key(-self.page_size()), lambda e: self.on_key(self.page_size()),
+                    lambda e: self.on_key(-len(self.rows)), lambda e: self.on_key(len(self.rows)))
+        for sequence, handler in zip(self.BINDINGS, handlers):
+            self.tree.bind(sequence, handler)
+    
+    def deactivate(self):
+        """Give the Treeview back its normal scrolling behaviour."""
+        if not self.active:
+            return
+        self.active = False
+        for sequence in self.BINDINGS:
+            self.tree.unbind(sequence)
+        self.tree.delete(*self.tree.get_children())
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.configure(command=self.tree.yview)
+        self.rows = []
+        self.first = 0
+        self.selected_row = None
+        self.reported_row = None
+    
+    def set_rows(self, rows):
+        """Replace the model rows and redraw."""
+        self.rows = rows
+        self.first = 0
+        self.selected_row = None
+        self.reported_row = None
+        self.render()
+    
+    def page_size(self):
+        """Number of rows that fit in the widget (one row height goes to the headings)."""
+        return max(1, self.tree.winfo_height() // self.rowheight - 1)
+    
+    def render(self, event=None):
+        """Write the visible window of rows into the Treeview items."""
+        count = len(self.rows)
+        size = self.page_size()
+        self.first = max(0, min(self.first, count - size))
+        window = self.rows[self.first:self.first + size]
+        
+        # Keep exactly one item per visible row, named by its screen position
+        items = self.tree.get_children()
+        if len(items) > len(window):
+            self.tree.delete(*items[len(window):])
+        for position in range(len(items), len(window)):
+            self.tree.insert("", tk.END, iid=f"v{position}")
+        
+        for position, row in enumerate(window):
+            self.tree.item(f"v{position}", values=self.format_row(row))
+        
+        if self.selected_row is not None and 0 <= self.selected_row - self.first < len(window):
+            self.tree.selection_set(f"v{self.selected_row - self.first}")
+        elif self.tree.selection():
+            self.tree.selection_set(())
+        
+        if count:
+            self.scrollbar.set(self.first / count, min(1.0, (self.first + size) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages")."""
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = self.page_size() if args[2] == "pages" else 1
+            self.first += int(args[1]) * step
+        self.render()
+    
+    def scroll(self, rows):
+        """Move the window by a number of rows."""
+        self.first += rows
+        self.render()
+        return "break"
+    
+    def on_mousewheel(self, event):
+        """Scroll on mouse wheel (Windows reports multiples of 120, macOS small steps)."""
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * delta)
+    
+    def on_select(self, event):
+        """Remember the selected model row so it survives scrolling, and report new selections.
+        
+        Scrolling selects the row again as it comes back on screen, which
+        isn't reported a second time.
+        """
+        if self.active:
+            selection = self.tree.selection()
+            if not selection:
+                return
+            self.selected_row = self.first + self.tree.index(selection[0])
+            if self.selected_row == self.reported_row:
+                return
+            self.reported_row = self.selected_row
+        if self.select_callback:
+            self.select_callback(event)
+    
+    def on_key(self, step):
+        """Move the selection with the keyboard, scrolling the window along."""
+        if not self.rows:
+            return "break"
+        current = self.selected_row if self.selected_row is not None else self.first
+        self.selected_row = max(0, min(len(self.rows) - 1, current + step))
+        size = self.page_size()
+        if self.selected_row < self.first:
+            self.first = self.selected_row
+        elif self.selected_row >= self.first + size:
+            self.first = self.selected_row - size + 1
+        self.render()
+        return "break"
 
 class ScheduleGUI:
     def __init__(self, root):
@@ -403,11 +3125,38 @@ class ScheduleGUI:
         self.create_save_selector()
         self.create_notebook()
         
-        # Status bar at the bottom
+        # Status bar at the bottom, with progress and cancel for background jobs
+        status_frame = ttk.Frame(root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        
         self.status_var = tk.StringVar()
         self.status_var.set("Ready")
-        status_bar = ttk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Where the time of the last operation went
+        self.timing_var = tk.StringVar()
+        timing_label = ttk.Label(status_frame, textvariable=self.timing_var, relief=tk.SUNKEN, anchor=tk.E)
+        timing_label.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_btn = ttk.Button(status_frame, text="Cancel", command=self.cancel_job, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT)
+        
+        self.progress_bar = ttk.Progressbar(status_frame, length=160, mode="determinate")
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        
+        # Only one background job runs at a time
+        self.job = None
+        self._job_callbacks = None
+        self._job_trace_mark = 0
+        
+        # Opt-in trace file for reports of slow operations
+        trace_path = os.environ.get(TRACE_ENV)
+        if trace_path and tracer.path is None:
+            try:
+                tracer.enable(trace_path)
+            except (OSError, ValueError):
+                pass
         
         # Auto-detect saves
         self.save_paths = []
@@ -435,6 +3184,34 @@ class ScheduleGUI:
         detect_btn = ttk.Button(save_frame, text="Auto-Detect", command=self.detect_saves)
         detect_btn.grid(row=0, column=3, padx=8, pady=8, sticky=tk.W)
         
+        # Incremental snapshots instead of full backup copies
+        self.snapshot_var = tk.BooleanVar(value=False)
+        snapshot_check = ttk.Checkbutton(save_frame, text="Incremental backups",
+                                         variable=self.snapshot_var, command=self.on_backup_mode_changed)
+        snapshot_check.grid(row=0, column=4, padx=8, pady=8, sticky=tk.W)
+        
+        # Compact output instead of keeping the game's formatting
+        self.compact_json_var = tk.BooleanVar(value=False)
+        compact_check = ttk.Checkbutton(save_frame, text="Compact JSON",
+                                        variable=self.compact_json_var, command=self.on_json_style_changed)
+        compact_check.grid(row=1, column=4, padx=8, pady=8, sticky=tk.W)
+        
+        # Step through the rename history kept with the save
+        undo_btn = ttk.Button(save_frame, text="Undo", command=lambda: self.replay_history("undo"))
+        undo_btn.grid(row=0, column=5, padx=8, pady=8, sticky=tk.W)
+        
+        redo_btn = ttk.Button(save_frame, text="Redo", command=lambda: self.replay_history("redo"))
+        redo_btn.grid(row=1, column=5, padx=8, pady=8, sticky=tk.W)
+        
+        # Referential integrity check, on demand or after every change
+        check_btn = ttk.Button(save_frame, text="Check Save", command=self.check_save)
+        check_btn.grid(row=0, column=6, padx=8, pady=8, sticky=tk.W)
+        
+        self.check_after_var = tk.BooleanVar(value=False)
+        check_after = ttk.Checkbutton(save_frame, text="Check after changes", variable=self.check_after_var,
+                                      command=self.on_check_after_changed)
+        check_after.grid(row=1, column=6, padx=8, pady=8, sticky=tk.W)
+        
         # Current save path label
         self.path_var = tk.StringVar()
         path_label = ttk.Label(save_frame, textvariable=self.path_var)
@@ -473,25 +3250,46 @@ class ScheduleGUI:
         
         self.search_var = tk.StringVar()
         self.search_var.trace("w", self.filter_product_list)
+        self._filter_job = None
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=5, pady=5, fill=tk.X, expand=True)
         
         refresh_btn = ttk.Button(search_frame, text="Refresh", command=self.refresh_product_list)
         refresh_btn.pack(side=tk.RIGHT, padx=5, pady=5)
         
+        # Live updates while the game is running
+        self.watch_var = tk.BooleanVar(value=False)
+        watch_check = ttk.Checkbutton(search_frame, text="Watch for changes",
+                                      variable=self.watch_var, command=self.update_watcher)
+        watch_check.pack(side=tk.RIGHT, padx=5, pady=5)
+        
+        prices_btn = ttk.Button(search_frame, text="Edit Prices...", command=self.edit_prices)
+        prices_btn.pack(side=tk.RIGHT, padx=5, pady=5)
+        self.watcher = None
+        self.watch_events = queue.Queue()
+        
         # Create a treeview for products
-        columns = ("ID", "Name", "Type", "Properties")
+        columns = ("ID", "Name", "Type", "Price", "Properties")
         self.product_tree = ttk.Treeview(self.products_tab, columns=columns, show="headings")
         
         # Sort variables
         self.sort_column = "Type"  # Default sort column
         self.sort_reverse = False  # Ascending by default
         
+        # The tool's product catalog, kept in memory between refreshes. Tree
+        # items are named after their row in the catalog and are only
+        # detached and reattached while filtering or sorting.
+        self.catalog = ProductCatalog()
+        self.filter_index = ProductFilterIndex([])
+        self.sorted_rows = []
+        self.visible_rows = set()
+        
         # Column display text mapping
         self.column_display = {
             "ID": "Product ID",
             "Name": "Display Name", 
             "Type": "Type",
+            "Price": "Price",
             "Properties": "Properties"
         }
         
@@ -510,20 +3308,111 @@ class ScheduleGUI:
         self.product_tree.column("ID", width=150)
         self.product_tree.column("Name", width=200)
         self.product_tree.column("Type", width=150)
+        self.product_tree.column("Price", width=80, anchor=tk.E)
         self.product_tree.column("Properties", width=250)
         
+        # Recipe lineage of the selected product, below the list
+        self.setup_lineage_panel()
+        
         # Add scrollbars
         tree_scroll_y = ttk.Scrollbar(self.products_tab, orient=tk.VERTICAL, command=self.product_tree.yview)
         tree_scroll_x = ttk.Scrollbar(self.products_tab, orient=tk.HORIZONTAL, command=self.product_tree.xview)
         self.product_tree.configure(yscrollcommand=tree_scroll_y.set, xscrollcommand=tree_scroll_x.set)
         
-        # Place scrollbars and treeview
-        tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        tree_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-        self.product_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Place scrollbars and treeview
+        tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        tree_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.product_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        # Bind double-click to open rename tab
+        self.product_tree.bind("<Double-1>", self.on_product_double_click)
+        
+        # Virtual mode for very large saves, switched on by refresh_product_list();
+        # it also owns the select binding that feeds the lineage panel
+        self.virtual_view = VirtualTreeview(self.product_tree, tree_scroll_y, rowheight=25,
+                                            format_row=self.format_product_row,
+                                            on_select=self.on_product_list_select)
+    
+    def setup_lineage_panel(self):
+        """Set up the recipe lineage panel of the products tab."""
+        lineage_frame = ttk.LabelFrame(self.products_tab, text="Recipe Lineage")
+        lineage_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
+        
+        self.lineage_var = tk.StringVar(value="Select a product to see what it is made from and mixed into")
+        lineage_label = ttk.Label(lineage_frame, textvariable=self.lineage_var)
+        lineage_label.pack(anchor=tk.W, padx=5, pady=2)
+        
+        # Branches are filled in when opened, so huge recipe trees cost nothing until browsed
+        self.lineage_tree = ttk.Treeview(lineage_frame, show="tree", height=8)
+        lineage_scroll = ttk.Scrollbar(lineage_frame, orient=tk.VERTICAL, command=self.lineage_tree.yview)
+        self.lineage_tree.configure(yscrollcommand=lineage_scroll.set)
+        lineage_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.lineage_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.lineage_tree.bind("<<TreeviewOpen>>", self.on_lineage_open)
+        
+        # Tree item -> (product id, "up" for what it is made from or "down" for what it makes)
+        self.lineage_nodes = {}
+    
+    def on_product_list_select(self, event):
+        """Show the recipe lineage of the product selected in the list."""
+        selection = self.product_tree.selection()
+        if selection:
+            self.show_lineage(self.product_tree.item(selection[0], "values")[0])
+    
+    def show_lineage(self, product_id):
+        """Fill the lineage panel for one product."""
+        graph = self.mod_tool.get_recipe_graph()
+        self.lineage_tree.delete(*self.lineage_tree.get_children())
+        self.lineage_nodes = {}
+        if graph is None:
+            self.lineage_var.set("Could not load the recipes from Products.json")
+            return
+        
+        self.lineage_var.set(f"{product_id}: {len(graph.ancestors(product_id))} ancestor(s), "
+                             f"{len(graph.descendants(product_id))} descendant(s)")
+        
+        made_from = self.lineage_tree.insert("", tk.END, text=f"Made from ({len(graph.made_from(product_id))})",
+                                             open=True)
+        self.add_lineage_children(made_from, product_id, "up")
+        mixes_into = self.lineage_tree.insert("", tk.END, text=f"Mixes into ({len(graph.mixes_into(product_id))})",
+                                              open=True)
+        self.add_lineage_children(mixes_into, product_id, "down")
+    
+    def add_lineage_children(self, parent, product_id, direction):
+        """Insert one level of the lineage under a tree item."""
+        graph = self.mod_tool.recipe_graph
+        if direction == "up":
+            edges = [(product, f"{self.product_label(product)} + {mixer}") for product, mixer in graph.made_from(product_id)]
+        else:
+            edges = [(output, f"+ {mixer} -> {self.product_label(output)}") for mixer, output in graph.mixes_into(product_id)]
+        
+        for other_id, text in edges[:LINEAGE_CHILD_LIMIT]:
+            item = self.lineage_tree.insert(parent, tk.END, text=text)
+            self.lineage_nodes[item] = (other_id, direction)
+            # Placeholder so the branch can be opened, replaced by on_lineage_open()
+            if (graph.outputs if direction == "up" else graph.inputs).get(other_id):
+                self.lineage_tree.insert(item, tk.END, text="...")
+        if len(edges) > LINEAGE_CHILD_LIMIT:
+            self.lineage_tree.insert(parent, tk.END, text=f"... and {len(edges) - LINEAGE_CHILD_LIMIT} more")
+    
+    def on_lineage_open(self, event):
+        """Load the next level of a lineage branch when it is opened."""
+        item = self.lineage_tree.focus()
+        node = self.lineage_nodes.get(item)
+        children = self.lineage_tree.get_children(item)
+        if node is None or self.mod_tool.recipe_graph is None or len(children) != 1 \
+                or children[0] in self.lineage_nodes:
+            return
         
-        # Bind double-click to open rename tab
-        self.product_tree.bind("<Double-1>", self.on_product_double_click)
+        self.lineage_tree.delete(children[0])
+        self.add_lineage_children(item, *node)
+    
+    def product_label(self, product_id):
+        """Display name and ID of a product for the lineage panel."""
+        record = self.catalog.get(product_id)
+        if record is None or record.name == product_id:
+            return product_id
+        return f"{record.name} ({product_id})"
     
     def treeview_sort_column(self, column):
         """Sort treeview contents when a column is clicked."""
@@ -536,7 +3425,7 @@ class ScheduleGUI:
             self.sort_reverse = False
         
         # Update UI to show sort direction
-        for col in ("ID", "Name", "Type", "Properties"):
+        for col in ("ID", "Name", "Type", "Price", "Properties"):
             # Remove existing sort indicators
             if self.sort_column == col:
                 # Add the sort indicator
@@ -548,24 +3437,34 @@ class ScheduleGUI:
                 self.product_tree.heading(col, text=self.column_display[col],
                                         command=lambda c=col: self.treeview_sort_column(c))
         
-        # Get all items
-        items = self.product_tree.get_children('')
-        
-        # Get item values with appropriate data type conversion
-        data_list = []
-        for item in items:
-            value = self.product_tree.set(item, column)
-            
-            # Convert to appropriate data type for better sorting
-            # All values are strings in treeview, need to handle case-insensitive for text
-            data_list.append((value.lower() if isinstance(value, str) else value, item))
-        
-        # Sort the list - case-insensitive for strings
-        data_list.sort(reverse=self.sort_reverse)
-        
-        # Rearrange items in sorted order
-        for index, (_, item) in enumerate(data_list):
-            self.product_tree.move(item, '', index)
+        self.apply_sort()
+    
+    def apply_sort(self):
+        """Sort the whole model by the current column, then show the filtered rows in that order."""
+        # Case-insensitive, like the column values shown in the tree
+        column_index = ("ID", "Name", "Type", "Price", "Properties").index(self.sort_column)
+        records = self.catalog.records
+        format_row = self.format_product_row
+        if self.sort_column == "Price":
+            # Numerically, with products that have no price first
+            get_price = self.mod_tool.get_price
+            def key(row):
+                price = get_price(records[row].id)
+                return -1 if price is None else price
+        else:
+            def key(row):
+                return format_row(records[row])[column_index].lower()
+        self.sorted_rows = sorted(self.catalog.row_of.values(), key=key, reverse=self.sort_reverse)
+        self.show_visible_rows()
+    
+    def show_visible_rows(self):
+        """Show the rows passing the filter, in sort order, with one Tk call."""
+        visible = self.visible_rows
+        if self.virtual_view.active:
+            records = self.catalog.records
+            self.virtual_view.set_rows([records[row] for row in self.sorted_rows if row in visible])
+        else:
+            self.product_tree.set_children("", *[str(row) for row in self.sorted_rows if row in visible])
     
     def setup_rename_tab(self):
         """Set up the rename tab."""
@@ -644,14 +3543,33 @@ ogkush,Original Gangster Kush"""
         apply_btn = ttk.Button(button_frame, text="Apply Changes", command=self.apply_bulk_changes)
         apply_btn.pack(side=tk.LEFT, padx=5)
         
+        preview_btn = ttk.Button(button_frame, text="Preview Changes",
+                                 command=lambda: self.apply_bulk_changes(preview=True))
+        preview_btn.pack(side=tk.LEFT, padx=5)
+        
+        multi_btn = ttk.Button(button_frame, text="Apply to Saves...", command=self.choose_bulk_saves)
+        multi_btn.pack(side=tk.LEFT, padx=5)
+        
         import_btn = ttk.Button(button_frame, text="Import CSV", command=self.import_csv)
         import_btn.pack(side=tk.LEFT, padx=5)
         
         export_btn = ttk.Button(button_frame, text="Export to CSV", command=self.export_csv)
         export_btn.pack(side=tk.LEFT, padx=5)
         
-        clear_btn = ttk.Button(button_frame, text="Clear", command=lambda: self.bulk_text.delete(1.0, tk.END))
+        clear_btn = ttk.Button(button_frame, text="Clear", command=self.clear_bulk_text)
         clear_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Large imported files are streamed from disk instead of loaded into the text area
+        self.import_path = None
+        self.import_var = tk.StringVar()
+        import_label = ttk.Label(button_frame, textvariable=self.import_var)
+        import_label.pack(side=tk.LEFT, padx=5)
+    
+    def clear_bulk_text(self):
+        """Clear the bulk text area and forget any imported file."""
+        self.bulk_text.delete(1.0, tk.END)
+        self.import_path = None
+        self.import_var.set("")
     
     def setup_about_tab(self):
         """Set up the about tab."""
@@ -663,7 +3581,7 @@ ogkush,Original Gangster Kush"""
         title_label.pack(pady=10)
         
         # Version
-        version_label = ttk.Label(about_frame, text="Version 1.0.0")
+        version_label = ttk.Label(about_frame, text=f"Version {__version__}")
         version_label.pack(pady=2)
         
         # Description
@@ -705,6 +3623,61 @@ Features:
         self.on_save_selected(None)
         self.status_var.set(f"Found {len(self.save_paths)} save folder(s)")
     
+    def on_backup_mode_changed(self):
+        """Switch between full backup copies and incremental snapshots."""
+        self.mod_tool.backup_mode = "snapshot" if self.snapshot_var.get() else "copy"
+    
+    def on_json_style_changed(self):
+        """Switch between keeping the original file formatting and compact JSON."""
+        self.mod_tool.serializer = JsonSerializer("compact" if self.compact_json_var.get() else "preserve")
+    
+    def on_check_after_changed(self):
+        """Turn the integrity check after every rename on or off."""
+        self.mod_tool.check_after_commit = self.check_after_var.get()
+    
+    def check_save(self):
+        """Check the selected save for dangling references and stray files."""
+        if not self.mod_tool.save_path:
+            return
+        
+        def checked(report):
+            self.status_var.set(report.summary().splitlines()[0])
+            if report.ok:
+                messagebox.showinfo("Save Check", report.summary())
+            else:
+                messagebox.showwarning("Save Check", report.summary())
+        
+        self.run_job("Checking save", lambda job: self.mod_tool.check_integrity(job.progress), checked)
+    
+    def replay_history(self, action):
+        """Undo or redo the latest rename of the selected save."""
+        if not self.mod_tool.save_path:
+            return
+        
+        def replay(job):
+            return self.mod_tool.replay_history(action, job.progress)
+        
+        def replayed(outcome):
+            entry, results = outcome
+            if entry is None:
+                self.status_var.set(f"Nothing to {action}")
+                return
+            
+            failed = [result for result in results if not result["success"]]
+            if failed:
+                self.status_var.set(f"Could not {action} '{entry['label']}'")
+                details = "\n".join(f"{result['old_id']} -> {result['new_id']}: {result['error']}"
+                                    for result in failed[:15])
+                messagebox.showerror("Error", f"Could not {action} '{entry['label']}'. "
+                                              f"Nothing was changed.\n\n{details}")
+                return
+            
+            done = "Undid" if action == "undo" else "Redid"
+            self.status_var.set(f"{done} '{entry['label']}' from {entry['time']}")
+            self.refresh_product_list()
+        
+        self.run_job("Undoing rename" if action == "undo" else "Redoing rename", replay, replayed)
+    
     def browse_save(self):
         """Browse for save folder manually."""
         folder = filedialog.askdirectory(title="Select Schedule 1 Save Folder")
@@ -721,8 +3694,86 @@ Features:
                                      "The selected folder doesn't seem to be a valid Schedule 1 save folder.\n\n"
                                      "Please make sure it contains Products.json file.")
     
+    def run_job(self, name, work, on_done, on_error=None):
+        """Run work(job) on a worker thread and call on_done(result) on the Tk thread.
+        
+        Returns False without starting anything if another job is running.
+        """
+        if self.job is not None:
+            self.status_var.set(f"Busy: {self.job.name}... (wait for it or press Cancel)")
+            return False
+        
+        self.job = BackgroundJob(name, work)
+        self._job_callbacks = (on_done, on_error)
+        self._job_trace_mark = tracer.mark()
+        self.status_var.set(f"{name}...")
+        self.progress_bar.configure(mode="indeterminate", value=0)
+        self.progress_bar.start(20)
+        self.cancel_btn.configure(state=tk.NORMAL)
+        
+        self.job.start()
+        self.root.after(JOB_POLL_MS, self._poll_job)
+        return True
+    
+    def _poll_job(self):
+        """Apply queued progress and results from the running job."""
+        job = self.job
+        while True:
+            try:
+                kind, payload = job.events.get_nowait()
+            except queue.Empty:
+                self.root.after(JOB_POLL_MS, self._poll_job)
+                return
+            
+            if kind == "progress":
+                done, total = payload
+                if total:
+                    self.progress_bar.stop()
+                    self.progress_bar.configure(mode="determinate", maximum=total, value=done)
+                    self.status_var.set(f"{job.name}... {done}/{total}")
+                else:
+                    self.status_var.set(f"{job.name}... {done}")
+                continue
+            
+            # The job has finished one way or another
+            on_done, on_error = self._job_callbacks
+            self.job = None
+            self._job_callbacks = None
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate", value=0)
+            self.cancel_btn.configure(state=tk.DISABLED)
+            
+            if kind == "done":
+                # Before on_done(), which may start the next job (e.g. reloading the list)
+                self.timing_var.set(tracer.summarize(tracer.spans_since(self._job_trace_mark)))
+                on_done(payload)
+                
+                # Problems found by the check after a rename (with "Check after changes")
+                report = self.mod_tool.last_integrity_report
+                self.mod_tool.last_integrity_report = None
+                if report is not None and not report.ok:
+                    messagebox.showwarning("Save Check", report.summary())
+            elif kind == "cancelled":
+                self.status_var.set(f"{job.name} cancelled")
+            elif on_error is not None:
+                on_error(payload)
+            else:
+                self.status_var.set(f"{job.name} failed: {payload}")
+                messagebox.showerror("Error", f"An error occurred: {str(payload)}")
+            return
+    
+    def cancel_job(self):
+        """Cancel the running background job."""
+        if self.job is not None:
+            self.job.cancel()
+            self.status_var.set(f"Cancelling {self.job.name.lower()}...")
+    
     def on_save_selected(self, event):
         """Handle save selection."""
+        if self.job is not None:
+            self.status_var.set(f"Busy: {self.job.name}... (wait for it or press Cancel)")
+            return
+        
         selected = self.save_var.get()
         
         # Find the path for the selected save
@@ -731,65 +3782,304 @@ Features:
                 path = save[1]
                 self.mod_tool.set_save_path(path)
                 self.path_var.set(f"Path: {path}")
+                self.update_watcher()
                 self.refresh_product_list()
                 break
     
     def refresh_product_list(self):
-        """Refresh the product list."""
+        """Refresh the product list, reading the save on a worker thread."""
+        def load(job):
+            if not self.mod_tool.load_products_data():
+                return None
+            # Built here so the lineage panel doesn't have to wait for it
+            self.mod_tool.get_recipe_graph()
+            return self.mod_tool.get_product_details(progress=job.progress)
+        
+        self.run_job("Loading products", load, self.show_products)
+    
+    def show_products(self, catalog):
+        """Fill the product list from a freshly loaded ProductCatalog."""
         # Clear existing items
-        for item in self.product_tree.get_children():
-            self.product_tree.delete(item)
+        self.virtual_view.deactivate()
+        self.product_tree.delete(*self.product_tree.get_children())
         
-        # Update ID combo box
-        self.update_id_combo()
-            
         # Load products
-        if not self.mod_tool.load_products_data():
+        if catalog is None:
+            self.catalog = ProductCatalog()
+            self.filter_index = ProductFilterIndex([])
+            self.update_id_combo()
             self.status_var.set("Failed to load products data")
             return
             
-        # Get product details and populate treeview
-        products = self.mod_tool.get_product_details()
+        # The catalog is shared with the tool, the filter and the rename tab
+        self.catalog = catalog
+        self.filter_index = ProductFilterIndex(catalog.records)
         
-        for product in products:
-            # Apply filter if any
-            filter_text = self.search_var.get().lower()
-            if filter_text and not (filter_text in product["id"].lower() or filter_text in product["name"].lower()):
-                continue
-                
-            # Format properties as comma-separated string
-            properties_str = ", ".join(product["properties"]) if product["properties"] else ""
+        with tracer.span("treeview_populate", rows=len(catalog)):
+            # Very large catalogs only keep the visible window of rows in the widget
+            virtual = len(catalog) > VIRTUAL_LIST_THRESHOLD
+            if virtual:
+                self.virtual_view.activate()
+            else:
+                for row, product in enumerate(catalog.records):
+                    self.product_tree.insert("", tk.END, iid=str(row), values=self.format_product_row(product))
             
-            # Add to treeview
-            self.product_tree.insert("", tk.END, values=(
-                product["id"],
-                product["name"],
-                product["type"].replace("ProductData", ""),
-                properties_str
-            ))
+            # Update ID combo box
+            self.update_id_combo()
+            
+            # Apply the filter and the current sort
+            self.visible_rows = set(self.filter_index.search(self.search_var.get()))
+            self.apply_sort()
         
-        # Apply the default sort (by Type)
-        self.treeview_sort_column(self.sort_column)
+        # Everything on disk is now shown, including our own writes
+        if self.watcher is not None:
+            self.watcher.resync()
+            self._clear_watch_events()
         
-        self.status_var.set(f"Loaded {len(products)} products")
+        self.status_var.set(f"Loaded {len(catalog)} products")
     
-    def filter_product_list(self, *args):
-        """Filter the product list based on search text."""
-        self.refresh_product_list()
+    def format_product_row(self, product):
+        """Format a product's details as Treeview values."""
+        # Format properties as comma-separated string
+        properties_str = ", ".join(product.properties)
+        price = self.mod_tool.get_price(product.id)
+        return (
+            product.id,
+            product.name,
+            product.type.replace("ProductData", ""),
+            "" if price is None else str(price),
+            properties_str
+        )
     
-    def update_id_combo(self):
-        """Update the product ID combo box."""
-        if not self.mod_tool.load_products_data():
+    def edit_prices(self):
+        """Change the prices of the selected products, or of every shown one, in one go."""
+        selection = self.product_tree.selection()
+        if selection:
+            product_ids = [self.product_tree.item(item, "values")[0] for item in selection]
+            scope = f"the {len(product_ids)} selected product(s)"
+        else:
+            records = self.catalog.records
+            product_ids = [records[row].id for row in self.sorted_rows if row in self.visible_rows]
+            scope = f"all {len(product_ids)} shown product(s)"
+        
+        if not product_ids:
+            messagebox.showinfo("Info", "No products to change. Load a save or clear the filter first.")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Edit Prices")
+        dialog.transient(self.root)
+        
+        label = ttk.Label(dialog, text=f"Change the prices of {scope}:")
+        label.pack(padx=10, pady=(10, 5), anchor=tk.W)
+        
+        operation_var = tk.StringVar(value="set")
+        for operation, text in (("set", "Set to"), ("scale", "Change by percent (e.g. 10 or -25)"),
+                                ("round", "Round to the nearest multiple of")):
+            radio = ttk.Radiobutton(dialog, text=text, variable=operation_var, value=operation)
+            radio.pack(padx=20, pady=2, anchor=tk.W)
+        
+        value_var = tk.StringVar()
+        value_entry = ttk.Entry(dialog, textvariable=value_var, width=15)
+        value_entry.pack(padx=20, pady=5, anchor=tk.W)
+        value_entry.focus_set()
+        
+        def apply():
+            try:
+                value = float(value_var.get())
+            except ValueError:
+                messagebox.showerror("Error", "Enter a number", parent=dialog)
+                return
+            if operation_var.get() == "round" and value <= 0:
+                messagebox.showerror("Error", "Round to a positive number", parent=dialog)
+                return
+            dialog.destroy()
+            self.apply_price_change(product_ids, operation_var.get(), value)
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(padx=10, pady=10, fill=tk.X)
+        
+        apply_btn = ttk.Button(button_frame, text="Apply", command=apply)
+        apply_btn.pack(side=tk.LEFT, padx=5)
+        
+        cancel_btn = ttk.Button(button_frame, text="Cancel", command=dialog.destroy)
+        cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+        dialog.grab_set()
+    
+    def apply_price_change(self, product_ids, operation, value):
+        """Run a bulk price change and show the new prices in the list."""
+        def update(job):
+            return self.mod_tool.update_prices(product_ids, operation, value, job.progress)
+        
+        def updated(counts):
+            if not counts:
+                self.status_var.set("Price update failed")
+                messagebox.showerror("Error", "Failed to load the save, create a backup or write Products.json")
+                return
+            
+            # Only the price column changed, so update the rows in place
+            if self.virtual_view.active:
+                self.virtual_view.render()
+            else:
+                records = self.catalog.records
+                for product_id in product_ids:
+                    row = self.catalog.row_of.get(product_id)
+                    if row is not None:
+                        self.product_tree.item(str(row), values=self.format_product_row(records[row]))
+            if self.sort_column == "Price":
+                self.apply_sort()
+            
+            # Our own write, not a change to pick up
+            if self.watcher is not None:
+                self.watcher.resync()
+                self._clear_watch_events()
+            
+            changed, skipped = counts
+            self.status_var.set(f"Updated {changed} price(s)" + (f", skipped {skipped}" if skipped else ""))
+        
+        self.run_job("Updating prices", update, updated)
+    
+    def update_watcher(self):
+        """Start or stop watching the selected save for changes."""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self._clear_watch_events()
+        
+        if self.watch_var.get() and self.mod_tool.save_path:
+            watcher = SaveWatcher(self.mod_tool.save_path)
+            self.watcher = watcher
+            # Tagged, so events a stopped watcher still sends can be told apart
+            watcher.start(lambda changes: self.watch_events.put((watcher, changes)))
+            self.root.after(JOB_POLL_MS, self._poll_watcher, watcher)
+            self.status_var.set("Watching save folder for changes")
+    
+    def _clear_watch_events(self):
+        """Drop queued watcher events."""
+        while not self.watch_events.empty():
+            self.watch_events.get_nowait()
+    
+    def _poll_watcher(self, watcher):
+        """Apply changes reported by the watcher thread, unless a job is using the save."""
+        if watcher is not self.watcher:
+            # Stopped, or replaced by a watcher on another save
             return
+        
+        if self.job is None:
+            changes = None
+            while not self.watch_events.empty():
+                source, event = self.watch_events.get_nowait()
+                if source is not watcher:
+                    continue
+                if changes is None:
+                    changes = event
+                else:
+                    changes = {key: changes[key] | event[key] for key in changes}
+            if changes:
+                self.apply_watch_changes(changes)
+        
+        self.root.after(JOB_POLL_MS, self._poll_watcher, watcher)
+    
+    def apply_watch_changes(self, changes):
+        """Re-read what changed on a worker thread, then update only the affected products."""
+        watcher = self.watcher
+        current = set(self.catalog.row_of)
+        
+        def reload(job):
+            known = current
+            repriced = set()
+            if changes["products_json"]:
+                old_prices = {product_id: self.mod_tool.get_price(product_id) for product_id in current}
+                if not self.mod_tool.load_products_data():
+                    return None
+                self.mod_tool.get_recipe_graph()
+                known = set(self.mod_tool.get_product_list())
+                repriced = {product_id for product_id in current & known
+                            if self.mod_tool.get_price(product_id) != old_prices[product_id]}
             
-        products = self.mod_tool.get_product_details()
-        product_ids = [p["id"] for p in products]
+            refresh_ids = (changes["changed"] | changes["added"] | changes["removed"] | (known - current)) & known
+            return self.mod_tool.get_details_for_ids(sorted(refresh_ids)), current - known, repriced
+        
+        def reloaded(result):
+            if watcher is not self.watcher:
+                # The save was switched or watching turned off meanwhile
+                return
+            if result is None:
+                # Probably caught the game mid-write, look again next time
+                watcher.forget_products_json()
+                self.status_var.set("Watching save folder for changes")
+                return
+            self.show_watch_changes(*result)
+        
+        self.run_job("Reading changes from disk", reload, reloaded)
+    
+    def show_watch_changes(self, products, removed_ids, repriced):
+        """Put re-read products in the catalog and the list, and drop removed ones."""
+        if not products and not removed_ids and not repriced:
+            self.status_var.set("Watching save folder for changes")
+            return
+        
+        catalog = self.catalog
+        virtual = self.virtual_view.active
+        for product in products:
+            is_new = product.id not in catalog
+            row = catalog.put(product)
+            if is_new:
+                self.filter_index.add(product)
+                if not virtual:
+                    self.product_tree.insert("", tk.END, iid=str(row), values=self.format_product_row(product))
+            else:
+                self.filter_index.update(row, product)
+                if not virtual:
+                    self.product_tree.item(str(row), values=self.format_product_row(product))
+        
+        for product_id in removed_ids:
+            row = catalog.remove(product_id)
+            self.filter_index.remove(row)
+            if not virtual:
+                self.product_tree.delete(str(row))
+        
+        if not virtual:
+            # Rows whose only change is their price; the virtual list redraws its window when sorted below
+            refreshed = {product.id for product in products}
+            for product_id in repriced - refreshed:
+                row = catalog.row_of.get(product_id)
+                if row is not None:
+                    self.product_tree.item(str(row), values=self.format_product_row(catalog.records[row]))
+        
+        self.update_id_combo(clear=False)
+        self.visible_rows = set(self.filter_index.search(self.search_var.get()))
+        self.apply_sort()
+        self.status_var.set(f"Updated {len(products)} and removed {len(removed_ids)} product(s) from disk")
+    
+    def filter_product_list(self, *args):
+        """Filter the product list based on search text, once typing pauses."""
+        if self._filter_job is not None:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(FILTER_DELAY_MS, self.apply_filter)
+    
+    def apply_filter(self):
+        """Narrow or widen the shown rows to the current filter, without reloading."""
+        self._filter_job = None
+        self.visible_rows = set(self.filter_index.search(self.search_var.get()))
+        self.show_visible_rows()
+        
+        if self.search_var.get().strip():
+            self.status_var.set(f"Showing {len(self.visible_rows)} of {len(self.catalog)} products")
+        else:
+            self.status_var.set(f"Loaded {len(self.catalog)} products")
+    
+    def update_id_combo(self, clear=True):
+        """Update the product ID combo box."""
+        product_ids = self.catalog.ids()
         
         self.orig_id_combo['values'] = product_ids
         
         # Clear existing selection
-        self.orig_id_var.set("")
-        self.orig_name_var.set("")
+        if clear:
+            self.orig_id_var.set("")
+            self.orig_name_var.set("")
     
     def on_product_selected(self, event):
         """Handle product selection in rename tab."""
@@ -799,11 +4089,10 @@ Features:
             return
             
         # Find the product details
-        for product in self.mod_tool.get_product_details():
-            if product["id"] == selected_id:
-                self.orig_name_var.set(product["name"])
-                self.new_name_var.set(product["name"])
-                break
+        product = self.catalog.get(selected_id)
+        if product is not None:
+            self.orig_name_var.set(product.name)
+            self.new_name_var.set(product.name)
     
     def on_product_double_click(self, event):
         """Handle double-click on product in the list."""
@@ -831,120 +4120,240 @@ Features:
             messagebox.showerror("Error", "Product ID and new name are required")
             return
         
-        # Create a valid ID from the name (lowercase, remove spaces, special chars)
-        new_id = re.sub(r'[^a-z0-9]', '', new_name.lower())
+        if self.job is not None:
+            self.status_var.set(f"Busy: {self.job.name}... (wait for it or press Cancel)")
+            return
+        
+        # Create a valid, unique ID from the name (lowercase, remove spaces, special chars)
+        new_id = self.mod_tool.allocate_product_id(orig_id, new_name)
         if not new_id:
             messagebox.showerror("Error", "New name must contain some alphanumeric characters")
             return
         
-        # Ensure the ID is unique
-        if new_id != orig_id and new_id in self.mod_tool.get_product_list():
-            # Add a number to make it unique
-            base_id = new_id
-            counter = 1
-            while new_id in self.mod_tool.get_product_list():
-                new_id = f"{base_id}{counter}"
-                counter += 1
-        
-        try:
+        def rename(job):
             # Change both ID and name
-            if self.mod_tool.change_product_id(orig_id, new_id, new_name):
+            return self.mod_tool.change_product_ids([(orig_id, new_id, new_name)], job.progress)[0]
+        
+        def renamed(result):
+            if result["success"]:
                 messagebox.showinfo("Success", f"Changed product '{orig_id}' to '{new_id}' with name '{new_name}'")
                 self.clear_rename_form()
                 self.refresh_product_list()
             else:
-                messagebox.showerror("Error", "Failed to rename product")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-    
-    def apply_bulk_changes(self):
-        """Apply bulk changes from text area."""
-        text = self.bulk_text.get(1.0, tk.END)
-        lines = text.strip().split("\n")
-        
-        # Get current product list for ID collision checking
-        product_list = self.mod_tool.get_product_list()
+                self.status_var.set("Rename failed")
+                messagebox.showerror("Error", f"Failed to rename product: {result['error']}")
         
-        # Track new IDs that will be created during this batch to avoid collisions
-        new_ids_in_batch = set()
+        self.run_job("Renaming product", rename, renamed)
+    
+    def apply_bulk_changes(self, preview=False):
+        """Apply bulk changes from the imported file or the text area.
         
-        rename_list = []
+        With preview the planned changes are only shown (and can be exported).
+        """
+        import_path = self.import_path
+        text = self.bulk_text.get(1.0, tk.END)
+        report = RenameImportReport()
         
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-                
-            parts = [part.strip() for part in line.split(",")]
-            if len(parts) < 2:
-                continue
-                
-            old_id = parts[0]
-            new_name = parts[1]
-            
-            # Create a valid ID from the name (lowercase, remove spaces, special chars)
-            new_id = re.sub(r'[^a-z0-9]', '', new_name.lower())
-            if not new_id:
-                # Skip entries that would generate invalid IDs
-                messagebox.showwarning("Warning", f"Skipping '{old_id}' - new name '{new_name}' would generate an invalid ID")
-                continue
-            
-            # Ensure the new ID is unique (both in database and current batch)
-            if new_id != old_id and (new_id in product_list or new_id in new_ids_in_batch):
-                # Add a number to make it unique
-                base_id = new_id
-                counter = 1
-                while new_id in product_list or new_id in new_ids_in_batch:
-                    new_id = f"{base_id}{counter}"
-                    counter += 1
-            
-            # Track this new ID to avoid collisions in the same batch
-            new_ids_in_batch.add(new_id)
+        def validate(job):
+            if import_path:
+                chunks = read_rename_file(import_path, report)
+            else:
+                chunks = iter_rename_rows(io.StringIO(text), report)
+            rename_list, lines = self.mod_tool.validate_rename_rows(chunks, report, job.progress)
             
-            # Add to rename list with auto-generated ID
-            rename_list.append((old_id, new_id, new_name))
+            # Work out the whole change set now so the confirmation can show it
+            try:
+                plan = self.mod_tool.plan_bulk_rename(rename_list, job.progress)
+            except OperationCancelled:
+                self.mod_tool.release_product_ids(new_id for _, new_id, _ in rename_list)
+                raise
+            return rename_list, lines, plan
+        
+        self.run_job("Reading rename list", validate,
+                     lambda validated: self.confirm_bulk_changes(validated, report, preview))
+    
+    def confirm_bulk_changes(self, validated, report, preview=False):
+        """Show the validation report and plan once and apply the plan after confirmation."""
+        rename_list, lines, plan = validated
+        problems = ""
+        if report.error_count:
+            problems = f"{report.error_count} line(s) will be skipped:\n{report.summary()}\n\n"
         
         if not rename_list:
-            messagebox.showinfo("Info", "No valid rename entries found")
+            messagebox.showinfo("Info", problems + "No valid rename entries found")
+            return
+        
+        if preview:
+            if messagebox.askyesno("Preview Changes", problems + plan.summary() +
+                                   "\n\nNothing has been changed. Export the plan to a file?"):
+                self.export_plan(plan)
+            self.mod_tool.discard_plan(plan)
             return
             
         # Confirm with user
         confirm = messagebox.askyesno("Confirm Bulk Rename", 
-                                     f"This will rename {len(rename_list)} products.\n\n"
-                                     "A backup will be created automatically.\n\n"
-                                     "Proceed?")
+                                     problems + plan.summary() + "\n\nProceed?")
         if not confirm:
+            self.mod_tool.discard_plan(plan)
             return
             
-        try:
-            success, errors = self.mod_tool.bulk_rename_from_list(rename_list)
-            if errors == 0:
-                messagebox.showinfo("Success", f"Successfully renamed {success} products")
+        def rename(job):
+            return self.mod_tool.bulk_rename_from_list(rename_list, job.progress, plan)
+        
+        def renamed(counts):
+            if counts:
+                report.add_results(lines, self.mod_tool.last_bulk_results)
+            else:
+                self.mod_tool.discard_plan(plan)
+            self.show_bulk_results(counts, report)
+        
+        self.run_job("Renaming products", rename, renamed)
+    
+    def choose_bulk_saves(self):
+        """Let the user pick the saves to apply the bulk rename list to."""
+        if not self.save_paths:
+            messagebox.showinfo("Info", "No saves found. Use Auto-Detect or Browse first.")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Apply to Saves")
+        dialog.transient(self.root)
+        
+        label = ttk.Label(dialog, text="Select the saves to apply the rename list to:")
+        label.pack(padx=10, pady=(10, 5), anchor=tk.W)
+        
+        listbox = tk.Listbox(dialog, selectmode=tk.MULTIPLE, exportselection=False, width=90,
+                             height=min(len(self.save_paths), 15))
+        listbox.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
+        for name, path in self.save_paths:
+            listbox.insert(tk.END, f"{name}    {path}")
+            if path == self.mod_tool.save_path:
+                listbox.selection_set(tk.END)
+        
+        def apply():
+            paths = [self.save_paths[index][1] for index in listbox.curselection()]
+            dialog.destroy()
+            if paths:
+                self.apply_bulk_to_saves(paths)
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(padx=10, pady=10, fill=tk.X)
+        
+        apply_btn = ttk.Button(button_frame, text="Apply", command=apply)
+        apply_btn.pack(side=tk.LEFT, padx=5)
+        
+        all_btn = ttk.Button(button_frame, text="Select All", command=lambda: listbox.selection_set(0, tk.END))
+        all_btn.pack(side=tk.LEFT, padx=5)
+        
+        cancel_btn = ttk.Button(button_frame, text="Cancel", command=dialog.destroy)
+        cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+        dialog.grab_set()
+    
+    def apply_bulk_to_saves(self, paths):
+        """Apply the bulk rename list to several saves in parallel worker processes."""
+        if self.job is not None:
+            self.status_var.set(f"Busy: {self.job.name}... (wait for it or press Cancel)")
+            return
+        
+        confirm = messagebox.askyesno("Confirm Multi-Save Rename",
+                                      f"This will apply the rename list to {len(paths)} saves.\n\n"
+                                      "A backup of each save will be created automatically.\n\n"
+                                      "Proceed?")
+        if not confirm:
+            return
+        
+        import_path = self.import_path
+        text = self.bulk_text.get(1.0, tk.END)
+        report = RenameImportReport()
+        mod_tool = self.mod_tool
+        options = {"backup_mode": mod_tool.backup_mode, "backup_keep": mod_tool.backup_keep,
+                   "json_style": mod_tool.serializer.style}
+        
+        def apply(job):
+            # Imported files are read by each worker, typed lists are parsed once here
+            if import_path:
+                source = import_path
             else:
-                messagebox.showwarning("Partial Success", 
-                                     f"Renamed {success} products successfully\n"
-                                     f"Failed to rename {errors} products")
+                source = [row for chunk in iter_rename_rows(io.StringIO(text), report) for row in chunk]
+            return apply_renames_to_saves(paths, source, progress=job.progress, **options)
+        
+        def applied(results):
+            summary = results.summary()
+            if report.error_count:
+                summary = f"{report.error_count} line(s) were skipped:\n{report.summary()}\n\n{summary}"
+            if results.errors or results.failed_saves or report.error_count:
+                messagebox.showwarning("Partial Success", summary)
+            else:
+                messagebox.showinfo("Success", summary)
             
-            self.refresh_product_list()
+            if mod_tool.save_path in paths:
+                self.refresh_product_list()
+        
+        self.run_job("Renaming in saves", apply, applied)
+    
+    def export_plan(self, plan):
+        """Save a rename plan as JSON."""
+        file_path = filedialog.asksaveasfilename(
+            title="Save Rename Plan",
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        
+        if not file_path:
+            return
+            
+        try:
+            with open(file_path, 'w') as f:
+                json.dump(plan.to_dict(), f, indent=4)
+                
+            self.status_var.set(f"Exported plan to {file_path}")
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            messagebox.showerror("Error", f"Failed to export plan: {str(e)}")
+    
+    def show_bulk_results(self, counts, report):
+        """Report the outcome of a bulk rename in a single dialog."""
+        if not counts:
+            self.status_var.set("Bulk rename failed")
+            messagebox.showerror("Error", "Failed to load the save or create a backup")
+            return
+        
+        success, errors = counts
+        if errors == 0:
+            messagebox.showinfo("Success", f"Successfully renamed {success} products")
+        else:
+            messagebox.showwarning("Partial Success",
+                                 f"Renamed {success} products successfully\n"
+                                 f"Failed to rename {errors} products\n\n{report.summary()}")
+        
+        self.refresh_product_list()
     
     def import_csv(self):
         """Import a CSV file for bulk rename."""
         file_path = filedialog.askopenfilename(
             title="Select CSV File",
-            filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("TSV files", "*.tsv"), ("Text files", "*.txt"), ("All files", "*.*")]
         )
         
         if not file_path:
             return
             
         try:
-            with open(file_path, 'r') as f:
+            # Small files are shown for editing, big ones are streamed on apply
+            if os.path.getsize(file_path) > IMPORT_PREVIEW_BYTES:
+                self.clear_bulk_text()
+                self.bulk_text.insert(tk.END, f"# Rename list will be read from {file_path}\n"
+                                              "# Press Apply Changes to validate and apply it, or Clear to cancel.")
+                self.import_path = file_path
+                self.import_var.set(f"Using {os.path.basename(file_path)}")
+                self.status_var.set(f"Imported {file_path}")
+                return
+            
+            with open(file_path, 'r', encoding='utf-8-sig') as f:
                 content = f.read()
             
             # Clear and set text
-            self.bulk_text.delete(1.0, tk.END)
+            self.clear_bulk_text()
             self.bulk_text.insert(tk.END, content)
             
             self.status_var.set(f"Imported {file_path}")
@@ -972,7 +4381,404 @@ Features:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export file: {str(e)}")
 
-if __name__ == "__main__":
+def run_gui():
+    """Start the Tk GUI."""
+    _import_tkinter()
     root = tk.Tk()
-    app = ScheduleGUI(root)
-    root.mainloop() 
\ No newline at end of file
+    ScheduleGUI(root)
+    root.mainloop()
+
+def _cli_print(args, data, lines):
+    """Print a result as JSON with --json, otherwise as plain text lines."""
+    if args.json:
+        print(json.dumps(data, indent=2))
+    else:
+        for line in lines:
+            print(line)
+
+def _cli_resolve_save(args, save):
+    """Turn a save argument (a folder path or a number from `saves`) into a folder path."""
+    if not os.path.isdir(save):
+        saves = find_save_folders(args.save_root)
+        if save.isdigit() and 1 <= int(save) <= len(saves):
+            return saves[int(save) - 1][1]
+        raise SystemExit(f"error: '{save}' is not a save folder or a save number from 'saves'")
+    return save
+
+def _cli_open_save(args):
+    """Resolve the save argument to a mod tool."""
+    save = _cli_resolve_save(args, args.save)
+    tool = Schedule1ModTool(save, backup_mode="snapshot" if getattr(args, "snapshot", False) else "copy",
+                            json_style=getattr(args, "json_style", "preserve"))
+    tool.check_after_commit = getattr(args, "check", False)
+    if getattr(args, "keep", None):
+        tool.backup_keep = args.keep
+    if getattr(args, "no_backup", False):
+        # Journaled commits keep the save consistent, the backup is only a safety net
+        tool.backup_made = True
+    if not tool.load_products_data():
+        raise SystemExit(f"error: could not load Products.json from '{save}'")
+    return tool
+
+def _cli_saves(args):
+    saves = find_save_folders(args.save_root)
+    _cli_print(args, [{"name": name, "path": path} for name, path in saves],
+               [f"{number}. {name}\t{path}" for number, (name, path) in enumerate(saves, 1)])
+    return 0
+
+def _cli_list(args):
+    tool = _cli_open_save(args)
+    catalog = tool.get_product_details()
+    if args.filter:
+        products = [catalog[row] for row in ProductFilterIndex(catalog.records).search(args.filter)]
+    else:
+        products = list(catalog)
+    prices = [tool.get_price(p.id) for p in products]
+    _cli_print(args, [dict(p.as_dict(), price=price) for p, price in zip(products, prices)],
+               [f"{p.id}\t{p.name}\t{p.type.replace('ProductData', '')}\t{'' if price is None else price}\t"
+                f"{', '.join(p.properties)}" for p, price in zip(products, prices)])
+    return 0
+
+def _cli_report_results(args, results, tool=None):
+    """Print per-entry rename results and return the exit code."""
+    failed = [result for result in results if not result["success"]]
+    lines = [f"{r['old_id']} -> {r['new_id']}: " + ("ok" if r["success"] else r["error"]) for r in results]
+    lines.append(f"Renamed {len(results) - len(failed)} products, {len(failed)} failed")
+    data = {"results": results, "success": len(results) - len(failed), "errors": len(failed)}
+    problems = _cli_add_integrity(tool, data, lines)
+    _cli_print(args, data, lines)
+    return 1 if failed or problems else 0
+
+def _cli_add_integrity(tool, data, lines):
+    """Add the report of a --check run after a rename; returns whether it found problems."""
+    report = tool.last_integrity_report if tool is not None else None
+    if report is None:
+        return False
+    data["integrity"] = report.to_dict()
+    lines.append(report.summary(limit=50))
+    return not report.ok
+
+def _cli_run_plan(args, tool, rename_list):
+    """Plan the renames and apply them, or with --dry-run only print the plan.
+    
+    Returns the per-entry results, or None for a dry run.
+    """
+    plan = tool.plan_renames(rename_list)
+    if args.plan_output:
+        with open(args.plan_output, 'w') as f:
+            json.dump(plan.to_dict(), f, indent=4)
+    
+    if args.dry_run:
+        _cli_print(args, plan.to_dict(), [plan.summary(limit=50)])
+        return None
+    return tool.apply_plan(plan)
+
+def _cli_rename(args):
+    tool = _cli_open_save(args)
+    if args.keep_id:
+        rename_list, skipped = [(args.old_id, args.old_id, args.new_name)], []
+    elif args.new_id:
+        rename_list, skipped = [(args.old_id, args.new_id, args.new_name)], []
+    else:
+        rename_list, skipped = tool.build_rename_list([(args.old_id, args.new_name)])
+    if skipped:
+        raise SystemExit(f"error: {skipped[0][2]}")
+    
+    results = _cli_run_plan(args, tool, rename_list)
+    if results is None:
+        return 0
+    return _cli_report_results(args, results, tool)
+
+def _cli_bulk(args):
+    tool = _cli_open_save(args)
+    report = RenameImportReport()
+    rename_list, lines = tool.validate_rename_rows(read_rename_file(args.file, report), report)
+    
+    if args.dry_run and report.error_count and not args.json:
+        print(f"{report.error_count} line(s) will be skipped:\n{report.summary(limit=50)}")
+    
+    results = _cli_run_plan(args, tool, rename_list)
+    if results is None:
+        return 0
+    report.add_results(lines, results)
+    
+    succeeded = sum(1 for result in results if result["success"])
+    data = {
+        "rows": report.rows,
+        "success": succeeded,
+        "errors": report.error_count,
+        "problems": [{"line": line, "old_id": old_id, "error": message}
+                     for line, old_id, message in report.errors],
+    }
+    text = [f"Read {report.rows} rows, renamed {succeeded} products, {report.error_count} problem(s)"]
+    if report.error_count:
+        text.append(report.summary(limit=50))
+    problems = _cli_add_integrity(tool, data, text)
+    _cli_print(args, data, text)
+    return 1 if report.error_count or problems else 0
+
+def _cli_multi(args):
+    if args.all:
+        saves = [path for _, path in find_save_folders(args.save_root)]
+    else:
+        saves = [_cli_resolve_save(args, save) for save in args.saves]
+    if not saves:
+        raise SystemExit("error: no saves given (list them or use --all)")
+    
+    report = apply_renames_to_saves(
+        saves, args.file, workers=args.workers, backup=not args.no_backup,
+        backup_mode="snapshot" if args.snapshot else "copy", backup_keep=args.keep or 10,
+        json_style=args.json_style, dry_run=args.dry_run)
+    
+    _cli_print(args, report.to_dict(), [report.summary()])
+    return 1 if report.errors or report.failed_saves else 0
+
+def _cli_history(args):
+    history = _cli_open_save(args).get_history()
+    entries = [dict(entry, state="done") for entry in history.undo] + \
+              [dict(entry, state="undone") for entry in reversed(history.redo)]
+    for entry in entries:
+        entry["changes"] = [{key: value for key, value in change.items() if key != "locations"}
+                            for change in entry["changes"]]
+    _cli_print(args, entries,
+               [f"{entry['time']}  {entry['label']}" + ("  (undone)" if entry["state"] == "undone" else "")
+                for entry in entries] or ["No renames recorded"])
+    return 0
+
+def _cli_undo(args):
+    tool = _cli_open_save(args)
+    entry, results = tool.replay_history(args.command, force=args.force)
+    if entry is None:
+        _cli_print(args, {"results": [], "success": 0, "errors": 0}, [f"Nothing to {args.command}"])
+        return 0
+    return _cli_report_results(args, results, tool)
+
+def _cli_lineage(args):
+    tool = _cli_open_save(args)
+    product_id = args.product_id
+    if not tool.product_exists(product_id):
+        raise SystemExit(f"error: product '{product_id}' not found")
+    
+    graph = tool.get_recipe_graph()
+    made_from = graph.made_from(product_id)
+    mixes_into = graph.mixes_into(product_id)
+    ancestors = sorted(graph.ancestors(product_id))
+    descendants = sorted(graph.descendants(product_id))
+    
+    data = {
+        "id": product_id,
+        "made_from": [{"product": product, "mixer": mixer} for product, mixer in made_from],
+        "mixes_into": [{"mixer": mixer, "output": output} for mixer, output in mixes_into],
+        "ancestors": ancestors,
+        "descendants": descendants,
+    }
+    lines = [f"Made from ({len(made_from)}):"] + [f"  {product} + {mixer}" for product, mixer in made_from]
+    lines += [f"Mixes into ({len(mixes_into)}):"] + [f"  + {mixer} -> {output}" for mixer, output in mixes_into]
+    lines.append(f"{len(ancestors)} ancestor(s), {len(descendants)} descendant(s)")
+    _cli_print(args, data, lines)
+    return 0
+
+def _cli_prices(args):
+    tool = _cli_open_save(args)
+    if args.product_ids:
+        product_ids = args.product_ids
+    else:
+        catalog = tool.get_product_details()
+        if args.filter:
+            product_ids = [catalog[row].id for row in ProductFilterIndex(catalog.records).search(args.filter)]
+        else:
+            product_ids = catalog.ids()
+    
+    operation, value = next((operation, getattr(args, operation)) for operation in PRICE_OPERATIONS
+                            if getattr(args, operation) is not None)
+    if operation == "round" and value <= 0:
+        raise SystemExit("error: --round needs a positive number")
+    
+    counts = tool.update_prices(product_ids, operation, value)
+    if not counts:
+        raise SystemExit("error: could not back up the save or write Products.json")
+    
+    changed, skipped = counts
+    data = {"changed": changed, "skipped": skipped}
+    lines = [f"Changed {changed} price(s), skipped {skipped}"]
+    problems = _cli_add_integrity(tool, data, lines)
+    _cli_print(args, data, lines)
+    return 1 if problems else 0
+
+def _cli_check(args):
+    report = _cli_open_save(args).check_integrity()
+    _cli_print(args, report.to_dict(), [report.summary(limit=args.limit)])
+    return 0 if report.ok else 1
+
+def _cli_backup(args):
+    tool = _cli_open_save(args)
+    if not tool.make_backup():
+        raise SystemExit("error: backup failed")
+    path = tool.last_backup_path
+    _cli_print(args, {"backup": path}, [f"Backup created: {path}"])
+    return 0
+
+def _cli_export(args):
+    tool = _cli_open_save(args)
+    products = tool.get_product_details()
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            json.dump([p.as_dict() for p in products], output, indent=2)
+            output.write("\n")
+        else:
+            # original_id,new_name rows can be edited and fed straight back to `bulk`
+            writer = csv.writer(output)
+            writer.writerow(["# original_id", "new_name", "type", "properties"])
+            for p in products:
+                writer.writerow([p.id, p.name, p.type, ";".join(p.properties)])
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+def build_arg_parser():
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        prog="schedule1_rename_tool",
+        description="Rename Schedule 1 products from the command line. Run without arguments for the GUI.")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--save-root", action="append", default=[], metavar="FOLDER",
+                        help="extra folder to search for saves (can be repeated)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help=f"record operation timings to FILE (also set by {TRACE_ENV})")
+    parser.add_argument("--trace-format", choices=Tracer.FORMATS,
+                        help="trace file format (default: chrome for .json files, otherwise jsonl)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    # --json is also accepted after the command name
+    json_option = argparse.ArgumentParser(add_help=False)
+    json_option.add_argument("--json", action="store_true", default=argparse.SUPPRESS,
+                             help="print machine-readable JSON")
+    
+    command = commands.add_parser("saves", parents=[json_option], help="list detected save folders")
+    command.set_defaults(func=_cli_saves)
+    
+    command = commands.add_parser("list", parents=[json_option], help="list the products in a save")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    command.add_argument("--filter", help="only products whose ID, name or properties contain this text")
+    command.set_defaults(func=_cli_list)
+    
+    def add_backup_options(command):
+        command.add_argument("--snapshot", action="store_true", help="back up as an incremental snapshot")
+        command.add_argument("--keep", type=int, help="number of snapshots to keep")
+    
+    def add_write_options(command):
+        command.add_argument("--no-backup", action="store_true", help="skip the automatic backup")
+        command.add_argument("--dry-run", action="store_true",
+                             help="only show what would change: files, references, bytes and time")
+        command.add_argument("--plan-output", metavar="FILE", help="also write the rename plan to FILE as JSON")
+        command.add_argument("--check", action="store_true", help="check the save's integrity after the change")
+        command.add_argument("--json-style", choices=JsonSerializer.STYLES, default="preserve",
+                             help="keep each file's original formatting, or write compact JSON")
+        add_backup_options(command)
+    
+    command = commands.add_parser("rename", parents=[json_option], help="rename one product")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    command.add_argument("old_id")
+    command.add_argument("new_name")
+    command.add_argument("--new-id", help="use this ID instead of one generated from the name")
+    command.add_argument("--keep-id", action="store_true", help="only change the display name")
+    add_write_options(command)
+    command.set_defaults(func=_cli_rename)
+    
+    command = commands.add_parser("bulk", parents=[json_option], help="apply an original_id,new_name rename file")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    command.add_argument("file", help="CSV/TXT file with original_id,new_name lines")
+    add_write_options(command)
+    command.set_defaults(func=_cli_bulk)
+    
+    command = commands.add_parser("multi", parents=[json_option],
+                                  help="apply an original_id,new_name rename file to several saves in parallel")
+    command.add_argument("file", help="CSV/TXT file with original_id,new_name lines")
+    command.add_argument("saves", nargs="*", help="save folder paths, or numbers from 'saves'")
+    command.add_argument("--all", action="store_true", help="apply to every detected save")
+    command.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    command.add_argument("--no-backup", action="store_true", help="skip the automatic backups")
+    command.add_argument("--dry-run", action="store_true", help="only count what would change in each save")
+    command.add_argument("--json-style", choices=JsonSerializer.STYLES, default="preserve",
+                         help="keep each file's original formatting, or write compact JSON")
+    add_backup_options(command)
+    command.set_defaults(func=_cli_multi)
+    
+    command = commands.add_parser("prices", parents=[json_option],
+                                  help="set, scale or round the prices of many products at once")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    command.add_argument("product_ids", nargs="*", help="products to change (default: all, or --filter)")
+    command.add_argument("--filter", help="only products matching this text, like `list --filter`")
+    operation = command.add_mutually_exclusive_group(required=True)
+    operation.add_argument("--set", type=float, metavar="PRICE", help="set the price")
+    operation.add_argument("--scale", type=float, metavar="PERCENT", help="change prices by a percentage")
+    operation.add_argument("--round", type=float, metavar="STEP", help="round prices to a multiple of STEP")
+    command.add_argument("--no-backup", action="store_true", help="skip the automatic backup")
+    command.add_argument("--json-style", choices=JsonSerializer.STYLES, default="preserve",
+                         help="keep Products.json's original formatting, or write compact JSON")
+    command.add_argument("--check", action="store_true", help="check the save's integrity after the change")
+    add_backup_options(command)
+    command.set_defaults(func=_cli_prices)
+    
+    command = commands.add_parser("lineage", parents=[json_option],
+                                  help="show what a product is made from and mixed into")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    command.add_argument("product_id")
+    command.set_defaults(func=_cli_lineage)
+    
+    command = commands.add_parser("check", parents=[json_option],
+                                  help="check that Products.json and the product files agree")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    command.add_argument("--limit", type=int, default=50, help="problems to list (default 50)")
+    command.set_defaults(func=_cli_check)
+    
+    command = commands.add_parser("history", parents=[json_option], help="list the renames that can be undone")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    command.set_defaults(func=_cli_history)
+    
+    for name, help_text in (("undo", "undo the last rename"), ("redo", "redo the last undone rename")):
+        command = commands.add_parser(name, parents=[json_option], help=help_text)
+        command.add_argument("save", help="save folder path, or a number from 'saves'")
+        command.add_argument("--force", action="store_true",
+                             help="go ahead even if the save's references changed since the rename")
+        command.add_argument("--no-backup", action="store_true", help="skip the automatic backup")
+        command.add_argument("--check", action="store_true", help="check the save's integrity after the change")
+        add_backup_options(command)
+        command.set_defaults(func=_cli_undo)
+    
+    command = commands.add_parser("backup", parents=[json_option], help="back up a save folder")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    add_backup_options(command)
+    command.set_defaults(func=_cli_backup)
+    
+    command = commands.add_parser("export", parents=[json_option], help="export the product list")
+    command.add_argument("save", help="save folder path, or a number from 'saves'")
+    command.add_argument("-o", "--output", help="output file (default: standard output)")
+    command.add_argument("--format", choices=("csv", "json"), default="csv")
+    command.set_defaults(func=_cli_export)
+    
+    return parser
+
+def main(argv=None):
+    """Run the command line when given arguments, the GUI otherwise."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        run_gui()
+        return 0
+    
+    args = build_arg_parser().parse_args(argv)
+    trace_path = args.trace or os.environ.get(TRACE_ENV)
+    if trace_path:
+        tracer.enable(trace_path, args.trace_format)
+    try:
+        return args.func(args)
+    finally:
+        tracer.close()
+
+if __name__ == "__main__":
+    # Needed for the multi-save worker processes in the frozen Windows executable
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import os
+import json
+import random
+import argparse
+
+# Mixing effects shown as product properties in game
+PROPERTIES = [
+    "AntiGravity", "Athletic", "Balding", "BrightEyed", "Calming", "CalorieDense", "Cyclopean",
+    "Disorienting", "Electrifying", "Energizing", "Euphoric", "Explosive", "Focused", "Foggy",
+    "Gingeritis", "Glowie", "Jennerising", "Laxative", "LongFaced", "Munchies", "Paranoia",
+    "Refreshing", "Schizophrenic", "Sedating", "Seizure", "Shrinking", "Slippery", "Smelly",
+    "Sneaky", "Spicy", "ThoughtProvoking", "Toxic", "TropicThunder", "Zombifying",
+]
+
+MIXERS = [
+    "addy", "banana", "battery", "chili", "cuke", "donut", "energydrink", "flumedicine",
+    "gasoline", "horsesemen", "iodine", "megabean", "motoroil", "mouthwash", "paracetamol", "viagra",
+]
+
+# Product data type and base price range
+PRODUCT_TYPES = [
+    ("WeedProductData", 35, 120),
+    ("MethProductData", 70, 250),
+    ("CocaineProductData", 150, 400),
+]
+
+NAME_WORDS = [
+    "Blue", "Green", "Purple", "Golden", "Atomic", "Cosmic", "Electric", "Frosty", "Royal", "Sour",
+    "Crystal", "Dream", "Haze", "Kush", "Thunder", "Diesel", "Glue", "Cookies", "Widow", "Breath",
+]
+
+def make_product_names(count, rng):
+    """Unique display names built from word pairs, numbered once the pairs run out."""
+    pairs = [f"{first} {second}" for first in NAME_WORDS for second in NAME_WORDS if first != second]
+    rng.shuffle(pairs)
+    return [pairs[i] if i < len(pairs) else f"{pairs[i % len(pairs)]} {i // len(pairs) + 1}"
+            for i in range(count)]
+
+def make_save_data(product_count, recipe_density=1.0, price_ratio=1.0, favourite_ratio=0.05, seed=0):
+    """Build the contents of a synthetic save.
+
+    Returns (products_data, product_files) where products_data is the
+    Products.json document and product_files maps product IDs to their
+    CreatedProducts documents. recipe_density is the number of mix recipes
+    per product, price_ratio and favourite_ratio the share of products with
+    a set price or marked as favourite. The same seed gives the same save.
+    """
+    rng = random.Random(seed)
+    names = make_product_names(product_count, rng)
+    product_ids = ["".join(ch for ch in name.lower() if ch.isalnum()) for name in names]
+
+    product_files = {}
+    price_ranges = {}
+    for product_id, name in zip(product_ids, names):
+        data_type, low, high = rng.choice(PRODUCT_TYPES)
+        price_ranges[product_id] = (low, high)
+        product_files[product_id] = {
+            "DataType": data_type,
+            "DataVersion": 0,
+            "GameVersion": "0.3.3f14",
+            "Name": name,
+            "ID": product_id,
+            "DrugType": [entry[0] for entry in PRODUCT_TYPES].index(data_type),
+            "Properties": sorted(rng.sample(PROPERTIES, rng.randint(1, 8))),
+        }
+
+    # Each recipe mixes an earlier product (or base) into a later one
+    recipes = []
+    if product_count > 1:
+        for _ in range(int(product_count * recipe_density)):
+            output = rng.randrange(1, product_count)
+            recipes.append({
+                "Product": product_ids[rng.randrange(output)],
+                "Mixer": rng.choice(MIXERS),
+                "Output": product_ids[output],
+            })
+
+    priced = rng.sample(product_ids, int(product_count * price_ratio))
+    favourites = rng.sample(product_ids, int(product_count * favourite_ratio))
+
+    products_data = {
+        "DataType": "ProductManagerData",
+        "DataVersion": 0,
+        "GameVersion": "0.3.3f14",
+        "DiscoveredProducts": product_ids,
+        "ListedProducts": product_ids[::4],
+        "MixRecipes": recipes,
+        "ProductPrices": [{"String": product_id, "Int": rng.randint(*price_ranges[product_id])}
+                          for product_id in priced],
+        "FavouritedProducts": favourites,
+    }
+    return products_data, product_files
+
+def write_save(save_path, products_data, product_files):
+    """Write Products.json and CreatedProducts/*.json, formatted like the game does."""
+    created_dir = os.path.join(save_path, "CreatedProducts")
+    os.makedirs(created_dir, exist_ok=True)
+
+    for product_id, product_data in product_files.items():
+        with open(os.path.join(created_dir, f"{product_id}.json"), 'w') as f:
+            json.dump(product_data, f, indent=4)
+
+    with open(os.path.join(save_path, "Products.json"), 'w') as f:
+        json.dump(products_data, f, indent=4)
+
+def generate_save(save_path, product_count, recipe_density=1.0, price_ratio=1.0, favourite_ratio=0.05, seed=0):
+    """Write a synthetic save folder, see make_save_data()."""
+    write_save(save_path, *make_save_data(product_count, recipe_density, price_ratio, favourite_ratio, seed))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic Schedule 1 save folder for testing")
+    parser.add_argument("save_path", help="folder to create")
+    parser.add_argument("--products", type=int, default=1000, help="number of created products")
+    parser.add_argument("--recipes", type=float, default=1.0, help="mix recipes per product")
+    parser.add_argument("--prices", type=float, default=1.0, help="share of products with a price")
+    parser.add_argument("--favourites", type=float, default=0.05, help="share of favourited products")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    generate_save(args.save_path, args.products, args.recipes, args.prices, args.favourites, args.seed)
+    print(f"Wrote {args.products} products to {args.save_path}")
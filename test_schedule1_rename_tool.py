@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""Behavior checks for the rename tool, against small synthetic saves.
+
+Run with: python -m pytest -q
+"""
+import json
+import os
+
+import pytest
+
+from schedule1_rename_tool import (Schedule1ModTool, JsonSerializer, ProductFilterIndex, ProductIdAllocator,
+                                   ProductRecord, RecipeGraph, RenameImportReport, SaveFolderScanner,
+                                   apply_price_operation, main, read_rename_file,
+                                   HISTORY_FILE, JOURNAL_FILE, STAGED_SUFFIX)
+from synthetic_save import make_save_data, write_save
+
+class SimulatedCrash(BaseException):
+    """Stands in for the process dying; not an Exception, so no cleanup code catches it."""
+
+@pytest.fixture
+def save(tmp_path):
+    """A 50-product synthetic save; returns (save_path, products_data)."""
+    save_path = str(tmp_path / "SaveGame_1")
+    products_data, product_files = make_save_data(50)
+    write_save(save_path, products_data, product_files)
+    return save_path, products_data
+
+def open_tool(save_path):
+    """A tool on the save that doesn't spend time on backups."""
+    tool = Schedule1ModTool(save_path)
+    tool.backup_made = True
+    assert tool.load_products_data()
+    return tool
+
+def read_save(save_path):
+    """Contents of every save file by relative path, leaving out the tool's own files."""
+    files = {}
+    for root, _, names in os.walk(save_path):
+        for name in names:
+            if not name.startswith(".renamer"):
+                path = os.path.join(root, name)
+                with open(path, 'rb') as f:
+                    files[os.path.relpath(path, save_path)] = f.read()
+    return files
+
+def crash_on_call(monkeypatch, owner, name, call):
+    """Make owner.name raise SimulatedCrash on its call-th call."""
+    original = getattr(owner, name)
+    calls = []
+    def crashing(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == call:
+            raise SimulatedCrash()
+        return original(*args, **kwargs)
+    monkeypatch.setattr(owner, name, crashing)
+
+def leftovers(save_path):
+    """Journal and staged files still in the save."""
+    return [name for root, _, names in os.walk(save_path) for name in names
+            if name == JOURNAL_FILE or name.endswith(STAGED_SUFFIX)]
+
+def test_crash_while_staging_is_rolled_back(save, monkeypatch):
+    save_path, products_data = save
+    before = read_save(save_path)
+    old_id = products_data["DiscoveredProducts"][0]
+
+    tool = open_tool(save_path)
+    # The second staged file never gets synced
+    crash_on_call(monkeypatch, os, "fsync", 3)
+    with pytest.raises(SimulatedCrash):
+        tool.change_product_ids([(old_id, "crashed", None)])
+    monkeypatch.undo()
+    assert os.path.exists(os.path.join(save_path, JOURNAL_FILE))
+
+    tool = Schedule1ModTool(save_path)
+    assert tool.recover_pending_commit() == "rolled_back"
+    assert read_save(save_path) == before
+    assert leftovers(save_path) == []
+
+def test_crash_while_publishing_is_rolled_forward(save, monkeypatch):
+    save_path, products_data = save
+    old_id = products_data["DiscoveredProducts"][0]
+
+    tool = open_tool(save_path)
+    # Replaces 1 and 2 write the journal, 3 publishes the first staged file
+    crash_on_call(monkeypatch, os, "replace", 4)
+    with pytest.raises(SimulatedCrash):
+        tool.change_product_ids([(old_id, "published", "Published")])
+    monkeypatch.undo()
+
+    tool = Schedule1ModTool(save_path)
+    assert tool.load_products_data()
+    assert leftovers(save_path) == []
+    assert tool.product_exists("published") and not tool.product_exists(old_id)
+    assert not os.path.exists(os.path.join(save_path, "CreatedProducts", f"{old_id}.json"))
+    assert tool.check_integrity().ok
+    # The history line was appended exactly once
+    assert [entry["changes"][0]["new_id"] for entry in tool.get_history().undo] == ["published"]
+
+def test_interrupted_history_append_is_not_duplicated(save, monkeypatch):
+    save_path, products_data = save
+    first, second = products_data["DiscoveredProducts"][:2]
+
+    tool = open_tool(save_path)
+    tool.change_product_ids([(first, "first", None)])
+    # Crash just before the journal is removed, after the append was written
+    crash_on_call(monkeypatch, os, "remove", 3)
+    with pytest.raises(SimulatedCrash):
+        tool.change_product_ids([(second, "second", None)])
+    monkeypatch.undo()
+
+    tool = Schedule1ModTool(save_path)
+    assert tool.recover_pending_commit() == "rolled_forward"
+    with open(os.path.join(save_path, HISTORY_FILE)) as f:
+        assert len(f.readlines()) == 2
+    assert [entry["changes"][0]["new_id"] for entry in tool.get_history().undo] == ["first", "second"]
+
+@pytest.mark.parametrize("newline,indent", [("\n", 4), ("\r\n", 2)])
+def test_patched_products_json_only_changes_id_tokens(tmp_path, newline, indent):
+    save_path = str(tmp_path / "SaveGame_1")
+    products_data, product_files = make_save_data(50)
+    write_save(save_path, products_data, product_files)
+    # Formatting the serializer wouldn't reproduce
+    raw = json.dumps(products_data, indent=indent).replace("\n", newline).encode() + b"\n"
+    with open(os.path.join(save_path, "Products.json"), 'wb') as f:
+        f.write(raw)
+
+    # A listed and favourited product with recipes and a price
+    old_id = next(product_id for product_id in products_data["ListedProducts"]
+                  if product_id in products_data["FavouritedProducts"])
+    tool = open_tool(save_path)
+    assert len(tool.find_product_references(old_id)) > 2
+    assert tool.change_product_ids([(old_id, "patchedid", None)])[0]["success"]
+    assert tool._products_patcher is not None and tool._products_patcher.edits
+
+    with open(os.path.join(save_path, "Products.json"), 'rb') as f:
+        assert f.read() == raw.replace(json.dumps(old_id).encode(), b'"patchedid"')
+
+def test_undo_then_redo_restores_files_byte_for_byte(save):
+    save_path, products_data = save
+    ids = products_data["DiscoveredProducts"]
+    before = read_save(save_path)
+
+    tool = open_tool(save_path)
+    # A swap, a chain and a name-only change in one batch
+    renames = [(ids[0], "swaptmp", None), (ids[1], ids[0], "Swapped"), ("swaptmp", ids[1], None),
+               (ids[2], "chained", None), ("chained", "chained2", "Chained"), (ids[3], ids[3], "New Name")]
+    assert all(result["success"] for result in tool.change_product_ids(renames))
+    after = read_save(save_path)
+    assert after != before
+
+    # Undo and redo across a restart, so the history comes from the log
+    tool = open_tool(save_path)
+    _, results = tool.undo()
+    assert results and all(result["success"] for result in results)
+    assert read_save(save_path) == before
+
+    tool = open_tool(save_path)
+    _, results = tool.redo()
+    assert results and all(result["success"] for result in results)
+    assert read_save(save_path) == after
+
+def test_failed_read_refuses_the_whole_swap(save):
+    save_path, products_data = save
+    a, b, other = products_data["DiscoveredProducts"][:3]
+    a_path = os.path.join(save_path, "CreatedProducts", f"{a}.json")
+    with open(a_path, 'w') as f:
+        f.write("{broken")
+    before = read_save(save_path)
+
+    tool = open_tool(save_path)
+    results = tool.change_product_ids([(a, "tmpq", None), (b, a, None), ("tmpq", b, None),
+                                       (other, "unrelated", None)])
+    assert [result["success"] for result in results] == [False, False, False, True]
+
+    # Nothing of the swap was written
+    after = read_save(save_path)
+    for product_id in (a, b):
+        path = os.path.join("CreatedProducts", f"{product_id}.json")
+        assert after[path] == before[path]
+    tool = open_tool(save_path)
+    assert tool.get_product_list().count(a) == 1 and tool.get_product_list().count(b) == 1
+    assert tool.check_integrity().counts["duplicate_id"] == 0
+
+def test_plan_survives_a_reload_of_the_unchanged_save(save):
+    save_path, products_data = save
+    old_id = products_data["DiscoveredProducts"][0]
+
+    tool = open_tool(save_path)
+    reserved = tool.allocate_product_id(old_id, "Reserved Name")
+    plan = tool.plan_renames([(old_id, "reloaded", None)])
+    # What the watcher does when it sees the save folder change
+    assert tool.load_products_data()
+    results = tool.apply_plan(plan)
+
+    assert results[0]["success"]
+    assert tool.product_exists("reloaded") and not tool.product_exists(old_id)
+    assert tool.get_id_allocator().is_taken("reloaded") and tool.get_id_allocator().is_taken(reserved)
+    assert len(tool.get_history().undo) == 1
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_serializer_reads_values_orjson_cannot(use_orjson):
+    serializer = JsonSerializer(use_orjson=use_orjson)
+    raw = b'{"big": 123456789012345678901234567890, "low": -9223372036854775809, "nan": NaN, "inf": -Infinity}'
+    data = serializer.loads(raw)
+    assert data["big"] == 123456789012345678901234567890 and data["low"] == -9223372036854775809
+    # Written back exactly as the stdlib would
+    assert serializer.dumps(data) == json.dumps(json.loads(raw), indent=4)
+
+def test_bulk_rename_patches_products_json_in_one_pass(tmp_path):
+    save_path = str(tmp_path / "SaveGame_1")
+    products_data, product_files = make_save_data(50)
+    write_save(save_path, products_data, product_files)
+    raw = json.dumps(products_data, indent=2).replace("\n", "\r\n").encode()
+    with open(os.path.join(save_path, "Products.json"), 'wb') as f:
+        f.write(raw)
+
+    # More IDs than the patcher searches for one by one
+    old_ids = products_data["DiscoveredProducts"][:30]
+    tool = open_tool(save_path)
+    results = tool.change_product_ids([(old_id, f"bulk{index}", None) for index, old_id in enumerate(old_ids)])
+    assert all(result["success"] for result in results)
+    assert len(tool._products_patcher.edits) >= len(old_ids)
+
+    expected = raw
+    for index, old_id in enumerate(old_ids):
+        expected = expected.replace(json.dumps(old_id).encode(), f'"bulk{index}"'.encode())
+    with open(os.path.join(save_path, "Products.json"), 'rb') as f:
+        assert f.read() == expected
+
+def test_filter_index_matches_like_a_substring_scan():
+    products = [ProductRecord(f"kush{index}", f"Green Kush {index}", "Weed", ("Calming", "Energizing"[:index % 10]))
+                for index in range(40)]
+    index = ProductFilterIndex(products)
+    def scan(query):
+        return [row for row, product in enumerate(products)
+                if product is not None and query in "\n".join((product.id, product.name) + product.properties).lower()]
+
+    # Typing narrows from the previous result, deleting widens again
+    for query in ("k", "ku", "kus", "kush1", "kush12", "kush1", "", "calm", "ENER", "kush3 ", "nothing"):
+        assert list(index.search(query)) == scan(query.strip().lower())
+
+    products[5] = ProductRecord("kush5", "Renamed", "Weed", ())
+    index.update(5, products[5])
+    index.remove(7)
+    products[7] = None
+    products.append(ProductRecord("newkush", "New Kush", "Weed", ()))
+    assert index.add(products[-1]) == len(products) - 1
+    for query in ("kush", "green kush 5", "renamed", "new", ""):
+        assert list(index.search(query)) == scan(query)
+
+def test_allocator_hands_out_the_first_free_numbered_id():
+    allocator = ProductIdAllocator(["kush", "kush1", "kush3", "og"])
+    assert allocator.allocate("og", current_id="og") == "og"
+    assert [allocator.allocate("kush") for _ in range(3)] == ["kush2", "kush4", "kush5"]
+    assert allocator.allocate("haze") == "haze"
+    assert allocator.is_taken("haze") and allocator.allocate("haze") == "haze1"
+
+    # A released or renamed-away ID is handed out again, lowest first
+    allocator.release("kush4")
+    allocator.commit("kush1", "skunk")
+    assert allocator.allocate("kush") == "kush1"
+    assert allocator.allocate("kush") == "kush4"
+    assert allocator.is_taken("skunk") and not allocator.is_taken("kush6")
+
+def test_rename_tool_never_reuses_a_taken_id(save):
+    save_path, products_data = save
+    first, second = products_data["DiscoveredProducts"][:2]
+    # A product file nobody lists still owns its ID
+    with open(os.path.join(save_path, "CreatedProducts", "unlistedkush.json"), 'w') as f:
+        json.dump({"ID": "unlistedkush", "Name": "Unlisted Kush"}, f)
+
+    tool = open_tool(save_path)
+    new_id = tool.allocate_product_id(first, "Unlisted Kush")
+    assert new_id == "unlistedkush1"
+    assert tool.allocate_product_id(second, "Unlisted Kush") == "unlistedkush2"
+    tool.release_product_ids(["unlistedkush2"])
+    assert tool.change_product_ids([(first, new_id, "Unlisted Kush")])[0]["success"]
+    assert tool.allocate_product_id(second, "Unlisted Kush") == "unlistedkush2"
+
+@pytest.mark.parametrize("name,text", [
+    ("renames.csv", '\ufeff# original_id,new_name\nkush,"Kush, Extra ""Strong"""\n\nbad\n  og , OG Haze \n'),
+    ("renames.tsv", 'kush\tKush, Extra "Strong"\nbad\n# comment\nog\tOG Haze\n'),
+])
+def test_rename_file_is_read_in_chunks_with_quoting(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    report = RenameImportReport()
+    chunks = list(read_rename_file(str(path), report, chunk_size=1))
+
+    assert [[row[1:] for row in chunk] for chunk in chunks] == [[("kush", 'Kush, Extra "Strong"')], [("og", "OG Haze")]]
+    assert report.rows == 3 and report.error_count == 1
+    assert report.errors[0][1:] == ("bad", "expected original_id,new_name")
+
+def test_rename_rows_are_validated_against_the_save(save):
+    save_path, products_data = save
+    first, second = products_data["DiscoveredProducts"][:2]
+    report = RenameImportReport()
+    rows = [(2, first, "Imported Kush"), (3, "missingkush", "Whatever"), (4, second, "!!!"), (5, second, "Imported Kush")]
+
+    tool = open_tool(save_path)
+    rename_list, lines = tool.validate_rename_rows([rows[:2], rows[2:]], report)
+    assert rename_list == [(first, "importedkush", "Imported Kush"), (second, "importedkush1", "Imported Kush")]
+    assert lines == [2, 5]
+    assert [(line, old_id) for line, old_id, _ in report.errors] == [(3, "missingkush"), (4, second)]
+
+    report.add_results(lines, tool.change_product_ids(rename_list))
+    assert report.error_count == 2
+    assert tool.product_exists("importedkush") and tool.product_exists("importedkush1")
+
+def test_snapshots_link_unchanged_files_and_keep_the_newest(save):
+    save_path, products_data = save
+    changed = os.path.join("CreatedProducts", f"{products_data['DiscoveredProducts'][0]}.json")
+    tool = Schedule1ModTool(save_path, backup_mode="snapshot", backup_keep=2)
+
+    first = tool.make_snapshot()
+    with open(os.path.join(save_path, changed), 'a') as f:
+        f.write("\n")
+    second = tool.make_snapshot()
+    assert read_save(second) == read_save(save_path)
+    assert read_save(first)[changed] != read_save(second)[changed]
+    for relative in read_save(save_path):
+        linked = os.path.samefile(os.path.join(first, relative), os.path.join(second, relative))
+        assert linked == (relative != changed)
+
+    third = tool.make_snapshot()
+    assert tool.list_snapshots() == [second, third]
+    assert not os.path.exists(first)
+    # make_backup() takes a snapshot once per session
+    assert tool.make_backup() and tool.last_backup_path == tool.list_snapshots()[-1]
+    assert tool.make_backup() and len(tool.list_snapshots()) == 2
+
+def test_scanner_finds_every_save_layout_and_picks_up_new_saves(tmp_path, monkeypatch):
+    root = tmp_path / "Saves"
+    def make(*parts):
+        folder = root.joinpath(*parts)
+        folder.mkdir(parents=True)
+        (folder / "Products.json").write_text("{}")
+        return str(folder)
+    legacy = make("111", "save")
+    new_style = make("111", "SaveGame_1")
+    nested = make("222", "SaveGame_2", "Products")
+    (root / "222" / "Backups").mkdir()
+    (root / "333" / "SaveGame_1").mkdir(parents=True)
+
+    scanner = SaveFolderScanner()
+    assert scanner.find([str(root), str(tmp_path / "missing")]) == [
+        ("Steam ID: 111 (save)", legacy),
+        ("Steam ID: 111 (SaveGame_1)", new_style),
+        ("Steam ID: 222 (SaveGame_2/Products)", nested),
+    ]
+
+    # Only the changed folder and the new one are listed again
+    added = make("333", "SaveGame_1", "Products")
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: listed.append(path) or scandir(path))
+    assert scanner.find([str(root)])[-1] == ("Steam ID: 333 (SaveGame_1/Products)", added)
+    assert sorted(listed) == [os.path.dirname(added), added]
+    monkeypatch.undo()
+    assert scanner.find([new_style]) == [("Custom: SaveGame_1", new_style)]
+
+def test_integrity_check_reports_each_kind_of_problem(tmp_path):
+    save_path = str(tmp_path / "SaveGame_1")
+    products_data, product_files = make_save_data(50)
+    write_save(save_path, products_data, product_files)
+    assert open_tool(save_path).check_integrity().ok
+
+    ids = products_data["DiscoveredProducts"]
+    products_data["DiscoveredProducts"].append(ids[0])
+    products_data["ListedProducts"].append("ghostkush")
+    products_data["MixRecipes"][0]["Output"] = "ghostkush"
+    product_files[ids[1]]["ID"] = "wrongid"
+    product_files["orphankush"] = dict(product_files[ids[2]], ID="orphankush")
+    write_save(save_path, products_data, product_files)
+    with open(os.path.join(save_path, "CreatedProducts", f"{ids[3]}.json"), 'w') as f:
+        f.write("{broken")
+
+    report = open_tool(save_path).check_integrity()
+    assert report.counts == {"duplicate_id": 1, "dangling_reference": 2, "orphaned_file": 1,
+                             "id_mismatch": 1, "unreadable_file": 1}
+    assert report.products == 50 and report.files == 51
+    problems = {(issue["kind"], issue["product_id"], issue["section"], issue["field"]) for issue in report.issues}
+    assert ("dangling_reference", "ghostkush", "MixRecipes", "Output") in problems
+    assert ("id_mismatch", ids[1], None, None) in problems
+
+def test_recipe_graph_lineage_follows_renames():
+    recipes = [{"Product": "ogkush", "Mixer": "cuke", "Output": "sourkush"},
+               {"Product": "sourkush", "Mixer": "banana", "Output": "bluekush"},
+               {"Product": "haze", "Mixer": "cuke", "Output": "bluekush"},
+               {"Product": "bluekush", "Mixer": "donut", "Output": "ogkush"}]
+    graph = RecipeGraph({"MixRecipes": recipes})
+    assert graph.made_from("bluekush") == [("sourkush", "banana"), ("haze", "cuke")]
+    assert graph.mixes_into("ogkush") == [("cuke", "sourkush")]
+    # The loop back to ogkush ends the walk
+    assert graph.ancestors("sourkush") == {"ogkush", "bluekush", "sourkush", "haze"}
+    assert graph.descendants("haze") == {"bluekush", "ogkush", "sourkush"}
+
+    for recipe in recipes:
+        for field in ("Product", "Output"):
+            recipe[field] = {"ogkush": "haze", "haze": "ogkush"}.get(recipe[field], recipe[field])
+    graph.rename({"ogkush": "haze", "haze": "ogkush"})
+    assert graph.made_from("bluekush") == [("sourkush", "banana"), ("ogkush", "cuke")]
+    assert graph.descendants("ogkush") == {"bluekush", "haze", "sourkush"}
+    assert graph.mixes_into("haze") == [("cuke", "sourkush")]
+
+def test_tool_recipe_graph_stays_current_across_renames(save):
+    save_path, products_data = save
+    recipe = products_data["MixRecipes"][0]
+    tool = open_tool(save_path)
+    graph = tool.get_recipe_graph()
+    assert recipe["Product"] in graph.ancestors(recipe["Output"])
+
+    assert tool.change_product_ids([(recipe["Product"], "renamedinput", None)])[0]["success"]
+    assert tool.get_recipe_graph() is graph
+    ancestors = graph.ancestors(recipe["Output"])
+    assert "renamedinput" in ancestors and recipe["Product"] not in ancestors
+
+def test_price_operations():
+    assert apply_price_operation([10, None, 99], "set", 42.4) == [42, 42, 42]
+    assert apply_price_operation([10, None, 99], "scale", -50) == [5, None, 50]
+    assert apply_price_operation([10, None, 99], "scale", -200) == [0, None, 0]
+    assert apply_price_operation([12, None, 99], "round", 25) == [0, None, 100]
+    with pytest.raises(ValueError):
+        apply_price_operation([10], "round", 0)
+    with pytest.raises(ValueError):
+        apply_price_operation([10], "double", 2)
+
+def test_bulk_price_update_persists_and_follows_renames(tmp_path):
+    save_path = str(tmp_path / "SaveGame_1")
+    products_data, product_files = make_save_data(50, price_ratio=0.5)
+    write_save(save_path, products_data, product_files)
+    priced = {entry["String"]: entry["Int"] for entry in products_data["ProductPrices"]}
+    with_price = next(product_id for product_id in products_data["DiscoveredProducts"] if product_id in priced)
+    without_price = next(product_id for product_id in products_data["DiscoveredProducts"] if product_id not in priced)
+
+    tool = open_tool(save_path)
+    assert tool.update_prices([with_price, without_price, "missingkush"], "scale", 100) == (1, 2)
+    assert tool.update_prices([without_price, with_price], "set", 77) == (2, 0)
+    assert tool.update_prices([with_price], "set", 77) == (0, 0)
+
+    # The new price entry is renamed along with the product
+    assert tool.change_product_ids([(without_price, "repriced", None)])[0]["success"]
+    tool = open_tool(save_path)
+    assert tool.get_price("repriced") == 77 and tool.get_price(with_price) == 77
+    assert tool.get_price(without_price) is None
+    assert tool.check_integrity().ok
+
+def run_cli(capsys, *argv):
+    """Run the command line with --json; returns (exit code, parsed output)."""
+    code = main(["--json", *argv])
+    out = capsys.readouterr().out
+    return code, json.loads(out) if out else None
+
+def test_cli_lists_renames_and_undoes(save, capsys, tmp_path):
+    save_path, products_data = save
+    first, second = products_data["DiscoveredProducts"][:2]
+    before = read_save(save_path)
+
+    code, products = run_cli(capsys, "list", save_path)
+    assert code == 0 and sorted(product["id"] for product in products) == sorted(products_data["DiscoveredProducts"])
+
+    code, plan = run_cli(capsys, "rename", save_path, first, "Cli Kush", "--dry-run", "--no-backup")
+    assert code == 0 and plan and read_save(save_path) == before
+
+    code, output = run_cli(capsys, "rename", save_path, first, "Cli Kush", "--no-backup", "--check")
+    assert code == 0 and output["success"] == 1 and output["integrity"]["ok"]
+    assert output["results"][0]["new_id"] == "clikush"
+
+    renames = tmp_path / "renames.csv"
+    renames.write_text(f"{second},Cli Haze\nmissingkush,Nothing\n")
+    code, output = run_cli(capsys, "bulk", save_path, str(renames), "--no-backup")
+    assert code == 1 and output["success"] == 1 and output["errors"] == 1
+    assert output["problems"][0]["old_id"] == "missingkush"
+
+    for _ in range(2):
+        assert run_cli(capsys, "undo", save_path, "--no-backup")[0] == 0
+    assert read_save(save_path) == before
+    code, report = run_cli(capsys, "check", save_path)
+    assert code == 0 and report["ok"]